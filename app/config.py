@@ -42,6 +42,12 @@ class Config(QConfig):
     DDNetFolder = ConfigItem("DDNet", "DDN1etFolder", get_ddnet_directory(), FolderValidator())
     DDNetCheckUpdate = ConfigItem("DDNet", "DDNetCheckUpdate", True, BoolValidator())
     DDNetAssetsCursor = ConfigItem("DDNet", "DDNetAssetsCursor", None)
+    ThumbnailCacheSize = OptionsConfigItem(
+        "缓存", "ThumbnailCacheSize", 256, OptionsValidator([128, 256, 512, 1024, 2048]))
+    ImageCacheSize = OptionsConfigItem(
+        "缓存", "ImageCacheSize", 128, OptionsValidator([64, 128, 256, 512, 1024]))
+    TrashSize = OptionsConfigItem(
+        "缓存", "TrashSize", 512, OptionsValidator([128, 256, 512, 1024, 2048]))
 
 
 cfg = Config()
@@ -1,6 +1,19 @@
 import mimetypes
 
+from PyQt5.QtGui import QImage
+
 
 def is_image(file_path):
     mime_type, _ = mimetypes.guess_type(file_path)
     return mime_type and mime_type.startswith('image/')
+
+
+def rgba_to_qimage(data, width: int, height: int) -> QImage:
+    """
+    将原始 RGBA 数据直接包装为 QImage，不经过编解码也不复制数据
+    返回的图像只在这个包装对象存活时有效，传出所在函数(信号、缓存)前需要 copy()
+    """
+    image = QImage(data, width, height, width * 4, QImage.Format_RGBA8888)
+    # QImage 不持有底层数据，需要保持引用
+    image.buffer = data
+    return image
@@ -0,0 +1,136 @@
+import os
+import shutil
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class AssetImporter(QThread):
+    """
+    在工作线程池中批量导入文件
+    普通文件直接复制，.zip 材质包按成员流式写入目标目录，不经过临时解压
+    覆盖检测基于导入开始时的目录快照，文件先写入临时名再替换，目录中不会出现写了一半的文件
+    """
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(dict)
+
+    # 进度信号的最小间隔(秒)
+    progress_interval = 0.05
+
+    def __init__(self, files, target_dir, extensions=('.png',), max_workers=None, parent=None):
+        super().__init__(parent)
+        self.files = files
+        self.target_dir = target_dir
+        self.extensions = tuple(extensions)
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2) * 2)
+
+        self.lock = threading.Lock()
+        self.done = 0
+        self.total = 0
+        self.copied = 0
+        self.errors = []
+        self.last_progress = 0
+
+    def plan(self):
+        """展开材质包，返回 (任务列表, 覆盖数)，任务为 (来源, zip 成员或 None, 目标文件名)"""
+        try:
+            existing = set(os.listdir(self.target_dir))
+        except OSError:
+            existing = set()
+
+        tasks = []
+        covered = 0
+        for file in self.files:
+            if zipfile.is_zipfile(file):
+                try:
+                    with zipfile.ZipFile(file) as archive:
+                        members = [i for i in archive.infolist() if not i.is_dir()]
+                except (OSError, zipfile.BadZipFile) as e:
+                    self.errors.append((os.path.basename(file), str(e)))
+                    continue
+
+                for member in members:
+                    name = os.path.basename(member.filename)
+                    if member.filename.startswith('__MACOSX/') or name.startswith('.') or \
+                            not name.lower().endswith(self.extensions):
+                        continue
+                    tasks.append((file, member, name))
+            else:
+                tasks.append((file, None, os.path.basename(file)))
+
+        for _, _, name in tasks:
+            if name in existing:
+                covered += 1
+            existing.add(name)
+        return tasks, covered
+
+    def __write(self, name, write):
+        target = os.path.join(self.target_dir, name)
+        tmp_file = f"{target}.{threading.get_ident()}.importing"
+        try:
+            write(tmp_file)
+            os.replace(tmp_file, target)
+        except Exception as e:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+            self.__finish(name, e)
+            return
+        self.__finish(name)
+
+    def __finish(self, name, error=None):
+        with self.lock:
+            self.done += 1
+            if error is None:
+                self.copied += 1
+            else:
+                self.errors.append((name, str(error)))
+
+            now = time.monotonic()
+            if now - self.last_progress >= self.progress_interval or self.done == self.total:
+                self.last_progress = now
+                self.progress.emit(self.done, self.total)
+
+    def copy_file(self, source, name):
+        self.__write(name, lambda target: shutil.copyfile(source, target))
+
+    def extract_archive(self, archive_file, members):
+        """顺序读取同一个材质包中的成员，每个成员直接流式写入目标文件"""
+        try:
+            archive = zipfile.ZipFile(archive_file)
+        except (OSError, zipfile.BadZipFile) as e:
+            for _, name in members:
+                self.__finish(name, e)
+            return
+
+        def extract(member, target):
+            with archive.open(member) as src, open(target, 'wb') as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+
+        with archive:
+            for member, name in members:
+                if self.isInterruptionRequested():
+                    return
+                self.__write(name, lambda target, member=member: extract(member, target))
+
+    def run(self):
+        tasks, covered = self.plan()
+        self.total = len(tasks)
+        self.progress.emit(0, self.total)
+
+        archives = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for source, member, name in tasks:
+                if member is None:
+                    executor.submit(self.copy_file, source, name)
+                else:
+                    archives.setdefault(source, []).append((member, name))
+
+            for archive_file, members in archives.items():
+                executor.submit(self.extract_archive, archive_file, members)
+
+        self.finished.emit({"total": self.total, "copied": self.copied, "covered": covered, "errors": self.errors})
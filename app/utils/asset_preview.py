@@ -0,0 +1,46 @@
+from PIL import Image
+
+from app.config import cfg
+
+# 预览结果发生变化时需要递增，使旧的缩略图缓存失效
+PREVIEW_VERSION = 1
+
+# 各类材质图的网格尺寸与预览区域 (网格宽, 网格高, x, y, 宽, 高)，与 DDNet 中精灵的划分一致
+# 没有列出的类型(实体层、光标)整张图缩小显示
+PREVIEW_REGIONS = {
+    # 锤子与手枪
+    'game': (32, 16, 2, 1, 4, 5),
+    # 第一个表情
+    'emoticons': (4, 4, 0, 0, 1, 1),
+    # 碎片、小球、血迹、烟雾、弹壳与二段跳
+    'particles': (8, 8, 0, 0, 4, 4),
+}
+
+
+def preview_renderer(list_type: str, size: int) -> str:
+    """不同材质类型、目标尺寸与缩放设置的预览分别缓存"""
+    return f"{list_type}-preview-v{PREVIEW_VERSION}-{size}px-{cfg.get(cfg.dpiScale)}"
+
+
+def render_preview(file: str, list_type: str, size: int = 60):
+    """截取材质图中有代表性的区域并缩小到高度为 size，失败时返回 None"""
+    try:
+        image = Image.open(file)
+        region = PREVIEW_REGIONS.get(list_type)
+        if region is not None:
+            grid_width, grid_height, x, y, width, height = region
+            cell_width, cell_height = image.width / grid_width, image.height / grid_height
+            image = image.crop((round(x * cell_width), round(y * cell_height),
+                                round((x + width) * cell_width), round((y + height) * cell_height)))
+        image = image.convert('RGBA')
+    except:
+        return None
+
+    if image.height > size:
+        width = max(1, round(image.width * size / image.height))
+        # 先按整数倍快速缩小，再做一次高质量缩放
+        factor = image.height // (size * 2)
+        if factor > 1:
+            image = image.reduce(factor)
+        image = image.resize((width, size), Image.LANCZOS)
+    return image
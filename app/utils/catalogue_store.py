@@ -0,0 +1,282 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import requests
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from app.config import config_path
+from app.utils.network import iter_catalogue
+
+TEEDATA_URL = "https://teedata.net"
+# 在线材质列表类型 → 目录数据中条目所在的字段
+CATALOGUE_SECTIONS = {
+    "skins": "skins",
+    "gameskins": "assets",
+    "emoticons": "assets",
+    "cursors": "assets",
+    "particles": "assets",
+    "entities": "assets",
+}
+
+
+def search_text(value) -> str:
+    """将条目中的作者、标签等字段转换为可搜索的文本"""
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        return ' '.join(search_text(i) for i in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(search_text(i) for i in value)
+    return str(value)
+
+
+class CatalogueStore:
+    """
+    teedata 目录的本地镜像，每个线程使用独立的 SQLite 连接，WAL 模式下同步时仍可读取
+    条目按 分类+名称 存储并保留网站上的顺序，名称、作者、标签建立 FTS5 三元组索引，不支持时退化为 LIKE
+    """
+    version = 2
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self.local = threading.local()
+        self.fts = True
+        self.init_lock = threading.Lock()
+        self.initialized = False
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+            connection = sqlite3.connect(self.db_file, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self.init_lock:
+                if not self.initialized:
+                    self.__create(connection)
+                    self.initialized = True
+            self.local.connection = connection
+        return connection
+
+    def __create(self, connection):
+        if connection.execute("PRAGMA user_version").fetchone()[0] != self.version:
+            connection.executescript("""
+                DROP TABLE IF EXISTS meta;
+                DROP TABLE IF EXISTS items;
+                DROP TABLE IF EXISTS items_fts;
+            """)
+            connection.execute(f"PRAGMA user_version={self.version}")
+
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                category TEXT NOT NULL,
+                name TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                text TEXT NOT NULL,
+                UNIQUE (category, name)
+            );
+            CREATE INDEX IF NOT EXISTS items_position ON items (category, position);
+        """)
+        try:
+            connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(name, author, tags, tokenize='trigram')")
+        except sqlite3.OperationalError:
+            self.fts = False
+        connection.commit()
+
+    def close(self):
+        """关闭当前线程的连接，工作线程结束前调用"""
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    def get_meta(self, key: str):
+        row = self.connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_meta(self, key: str, value: str):
+        connection = self.connection()
+        connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+        connection.commit()
+
+    def items(self, category: str) -> list:
+        rows = self.connection().execute(
+            "SELECT data FROM items WHERE category = ? ORDER BY position", (category,))
+        return [json.loads(data) for data, in rows]
+
+    def search(self, category: str, query: str) -> list:
+        """按名称、作者、标签搜索，不区分大小写，结果保持网站上的顺序"""
+        query = query.strip()
+        if not query:
+            return self.items(category)
+
+        connection = self.connection()
+        if self.fts and len(query) >= 3:
+            rows = connection.execute(
+                "SELECT items.data FROM items_fts JOIN items ON items.id = items_fts.rowid "
+                "WHERE items_fts MATCH ? AND items.category = ? ORDER BY items.position",
+                ('"{}"'.format(query.replace('"', '""')), category))
+        else:
+            # 三元组索引无法匹配少于三个字符的查询
+            pattern = "%{}%".format(re.sub(r'([\\%_])', r'\\\1', query.lower()))
+            rows = connection.execute(
+                "SELECT data FROM items WHERE category = ? AND text LIKE ? ESCAPE '\\' ORDER BY position",
+                (category, pattern))
+        return [json.loads(data) for data, in rows]
+
+    def sync(self, category: str, items) -> bool:
+        """
+        用 items 中的条目整体替换分类的内容，只写入新增或变化的条目，返回内容是否有变化
+        items 中途出错时回滚，镜像保持原样
+        """
+        connection = self.connection()
+        # 分类中已有的条目 名称 -> (id, 数据, 位置)
+        rows = {name: (item_id, data, position) for item_id, name, data, position in connection.execute(
+            "SELECT id, name, data, position FROM items WHERE category = ?", (category,))}
+        seen = set()
+        changed = False
+        try:
+            for position, item in enumerate(items):
+                name = str(item.get('name', ''))
+                data = json.dumps(item, ensure_ascii=False, sort_keys=True)
+                row = rows.get(name)
+                if row is not None:
+                    if row[0] in seen:
+                        # 同名条目重复出现时只保留第一个
+                        continue
+                    seen.add(row[0])
+                    if row[1] == data:
+                        if row[2] != position:
+                            changed = True
+                            connection.execute("UPDATE items SET position = ? WHERE id = ?", (position, row[0]))
+                        continue
+
+                changed = True
+                author = search_text(item.get('author') or item.get('creator'))
+                tags = search_text(item.get('tags'))
+                text = f"{name} {author} {tags}".lower()
+                if row is None:
+                    item_id = connection.execute(
+                        "INSERT INTO items (category, name, position, data, text) VALUES (?, ?, ?, ?, ?)",
+                        (category, name, position, data, text)).lastrowid
+                    rows[name] = (item_id, data, position)
+                    seen.add(item_id)
+                else:
+                    item_id = row[0]
+                    connection.execute(
+                        "UPDATE items SET position = ?, data = ?, text = ? WHERE id = ?",
+                        (position, data, text, item_id))
+                    if self.fts:
+                        connection.execute("DELETE FROM items_fts WHERE rowid = ?", (item_id,))
+                if self.fts:
+                    connection.execute("INSERT INTO items_fts (rowid, name, author, tags) VALUES (?, ?, ?, ?)",
+                                       (item_id, name, author, tags))
+
+            stale = [row[0] for row in rows.values() if row[0] not in seen]
+            if stale:
+                changed = True
+                connection.executemany("DELETE FROM items WHERE id = ?", ((i,) for i in stale))
+                if self.fts:
+                    connection.executemany("DELETE FROM items_fts WHERE rowid = ?", ((i,) for i in stale))
+            connection.commit()
+        except:
+            connection.rollback()
+            raise
+        return changed
+
+
+catalogue_store = CatalogueStore(f"{config_path}/app/cache/catalogue.db")
+
+
+def fetch_build_id(session=None):
+    """从 teedata 首页读取当前的 buildId，失败时返回 None"""
+    try:
+        response = (session or requests).get(f"{TEEDATA_URL}/", timeout=15)
+        match = re.search(r'"buildId":"(.*?)"', response.text)
+    except:
+        return None
+    return match.group(1) if match else None
+
+
+class CatalogueSync(QThread):
+    """
+    在工作线程中将 teedata 目录同步到本地镜像
+    优先使用上次记录的 buildId，请求失败时才重新读取首页；下载过程中按批发出条目，供尚无镜像的列表直接显示
+    """
+    chunk = pyqtSignal(str, list)
+    synced = pyqtSignal(str, bool)
+    finished = pyqtSignal(bool)
+
+    chunk_size = 60
+
+    def __init__(self, categories=None, parent=None):
+        super().__init__(parent)
+        self.categories = list(categories or CATALOGUE_SECTIONS)
+        self.emitted = False
+
+    def items(self, session, build_id, category):
+        """逐个产出下载到的条目，同时按批发出 chunk 信号"""
+        batch = []
+        url = f"{TEEDATA_URL}/_next/data/{build_id}/{category}.json"
+        for item in iter_catalogue(url, CATALOGUE_SECTIONS[category], session, self.isInterruptionRequested):
+            yield item
+            batch.append(item)
+            if len(batch) >= self.chunk_size:
+                self.emitted = True
+                self.chunk.emit(category, batch)
+                batch = []
+        if batch:
+            self.emitted = True
+            self.chunk.emit(category, batch)
+        if self.isInterruptionRequested():
+            raise InterruptedError
+
+    def run(self):
+        try:
+            self.finished.emit(self.sync())
+        finally:
+            catalogue_store.close()
+
+    def sync(self) -> bool:
+        session = requests.Session()
+        build_id = catalogue_store.get_meta("build_id")
+        refreshed = False
+        success = True
+
+        for category in self.categories:
+            while True:
+                if build_id is None:
+                    build_id = fetch_build_id(session)
+                    refreshed = True
+                    if build_id is None:
+                        return False
+                    catalogue_store.set_meta("build_id", build_id)
+
+                # 已经发出的条目无法撤回，这之后出错时不再用新的 buildId 重试
+                self.emitted = False
+                try:
+                    changed = catalogue_store.sync(category, self.items(session, build_id, category))
+                except InterruptedError:
+                    return False
+                except:
+                    if not refreshed and not self.emitted:
+                        # 网站更新后旧的 buildId 会失效
+                        build_id = None
+                        continue
+                    success = False
+                    break
+
+                self.synced.emit(category, changed)
+                break
+
+        if success:
+            catalogue_store.set_meta("synced_at", str(int(time.time())))
+        return success
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from app.config import config_path
+
+
+def hash_file(path: str):
+    """计算文件内容的 SHA-1，读取失败时返回 None"""
+    digest = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class ContentIndex:
+    """
+    材质文件的内容索引，记录 路径 → [大小, 修改时间, 哈希]
+    更新时只重新计算大小或修改时间变化的文件，哈希在线程池中并行计算
+    子类可以替换 compute 与 create_executor 以索引其他按文件计算的值
+    """
+    version = 1
+    compute = staticmethod(hash_file)
+
+    def __init__(self, index_file: str, max_workers=None):
+        self.index_file = index_file
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 2) * 2)
+        self.entries = {}
+        self.loaded = False
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.index_file, encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get("version") != self.version:
+                raise ValueError
+            self.entries = index["entries"]
+        except:
+            self.entries = {}
+        self.loaded = True
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.version, "entries": self.entries}, f, separators=(',', ':'))
+            os.replace(tmp_file, self.index_file)
+            self.dirty = False
+        except OSError:
+            pass
+
+    def update(self, stats: dict) -> dict:
+        """
+        stats 为 {路径: stat}，返回 {路径: 哈希}
+        只有大小或修改时间与索引不一致的文件会重新计算哈希
+        计算哈希时不持有锁，避免 GUI 线程调用 remove 时被阻塞
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+
+            hashes = {}
+            stale = []
+            for path, stat in stats.items():
+                entry = self.entries.get(path)
+                if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                    hashes[path] = entry[2]
+                else:
+                    stale.append(path)
+
+        if not stale:
+            return hashes
+
+        with self.create_executor() as executor:
+            digests = list(executor.map(self.compute, stale, chunksize=32))
+
+        with self.lock:
+            for path, digest in zip(stale, digests):
+                # 计算期间被删除(移到回收区)的文件不再写回索引
+                if digest is None or not os.path.exists(path):
+                    self.entries.pop(path, None)
+                    continue
+                stat = stats[path]
+                self.entries[path] = [stat.st_size, stat.st_mtime_ns, digest]
+                hashes[path] = digest
+            self.dirty = True
+
+        return hashes
+
+    def create_executor(self):
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def remove(self, paths):
+        with self.lock:
+            for path in paths:
+                if self.entries.pop(path, None) is not None:
+                    self.dirty = True
+
+    def duplicates(self, stats: dict) -> list:
+        """返回内容完全相同的文件分组，每组至少两个文件"""
+        hashes = self.update(stats)
+        groups = {}
+        for path, digest in hashes.items():
+            groups.setdefault((stats[path].st_size, digest), []).append(path)
+
+        with self.lock:
+            self.save()
+        return [sorted(group) for group in groups.values() if len(group) > 1]
+
+
+content_index = ContentIndex(f"{config_path}/app/cache/content_index.json")
+
+
+class DuplicateFinder(QThread):
+    """在工作线程中更新内容索引并查找重复文件"""
+    finished = pyqtSignal(list)
+
+    def __init__(self, stats: dict, parent=None):
+        super().__init__(parent)
+        self.stats = stats
+
+    def run(self):
+        try:
+            groups = content_index.duplicates(self.stats)
+        except:
+            groups = []
+        self.finished.emit(groups)
@@ -0,0 +1,150 @@
+import heapq
+import itertools
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage
+from requests.adapters import HTTPAdapter
+
+
+class DownloadScheduler(QObject):
+    """
+    图片下载调度器，固定数量的工作线程从优先级队列中取任务，priority 越小越先下载
+    每个主机共用一个保持连接的 Session，并限制同一主机同时进行的请求数
+    下载结果在 GUI 线程中交给回调，取消的任务在发出请求前直接丢弃，尚未开始的任务可以调整优先级
+    """
+    loaded = pyqtSignal(int, QImage)
+
+    max_workers = 8
+    # 同一主机的最大并发请求数
+    host_limit = 4
+    timeout = 15
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loaded.connect(self.__on_loaded)
+
+        self.counter = itertools.count()
+        # 主机 -> 堆，条目为 (priority, 任务号)，任务号递增，同优先级时先到先下载
+        # 取消或调整过优先级的旧条目留在堆中，取出时跳过
+        self.queues = {}
+        # 任务号 -> [地址, 主机, 回调, priority]，开始下载后 priority 为 None
+        self.tasks = {}
+        self.active = {}
+        self.sessions = {}
+        self.condition = threading.Condition()
+        self.workers = []
+        self.stopped = False
+
+    def request(self, url: str, callback, priority=0) -> int:
+        """添加下载任务，返回任务号，下载完成后以 QImage 调用 callback，失败时为空的 QImage"""
+        with self.condition:
+            task = next(self.counter)
+            host = urlsplit(url).netloc
+            self.tasks[task] = [url, host, callback, priority]
+            heapq.heappush(self.queues.setdefault(host, []), (priority, task))
+
+            if len(self.workers) < self.max_workers:
+                worker = threading.Thread(target=self.__work, daemon=True)
+                self.workers.append(worker)
+                worker.start()
+            self.condition.notify()
+        return task
+
+    def cancel(self, task: int):
+        with self.condition:
+            self.tasks.pop(task, None)
+
+    def set_priority(self, task: int, priority):
+        with self.condition:
+            entry = self.tasks.get(task)
+            if entry is None or entry[3] is None or entry[3] == priority:
+                return
+            entry[3] = priority
+            heapq.heappush(self.queues[entry[1]], (priority, task))
+            self.condition.notify()
+
+    def is_stale(self, item) -> bool:
+        """堆中的条目已被取消、开始下载或调整过优先级，需持有锁"""
+        entry = self.tasks.get(item[1])
+        return entry is None or entry[3] != item[0]
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.queues = {}
+            self.tasks = {}
+            self.condition.notify_all()
+
+    def session(self, host: str) -> requests.Session:
+        session = self.sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.host_limit)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self.sessions[host] = session
+        return session
+
+    def __next_task(self):
+        """取出未达到并发上限的主机中优先级最高的任务，需持有锁"""
+        best = None
+        for host, queue in self.queues.items():
+            if self.active.get(host, 0) >= self.host_limit:
+                continue
+            while queue and self.is_stale(queue[0]):
+                heapq.heappop(queue)
+            if queue and (best is None or queue[0] < self.queues[best][0]):
+                best = host
+
+        if best is None:
+            return None
+        _, task = heapq.heappop(self.queues[best])
+        entry = self.tasks[task]
+        entry[3] = None
+        return task, entry
+
+    def __work(self):
+        while True:
+            with self.condition:
+                while True:
+                    if self.stopped:
+                        return
+                    result = self.__next_task()
+                    if result is not None:
+                        break
+                    self.condition.wait()
+
+                task, (url, host, _, _) = result
+                self.active[host] = self.active.get(host, 0) + 1
+                session = self.session(host)
+
+            try:
+                response = session.get(url, timeout=self.timeout)
+                response.raise_for_status()
+                image = QImage()
+                image.loadFromData(response.content)
+            except:
+                image = QImage()
+
+            with self.condition:
+                self.active[host] -= 1
+                self.condition.notify_all()
+            self.loaded.emit(task, image)
+
+    def __on_loaded(self, task, image):
+        with self.condition:
+            entry = self.tasks.pop(task, None)
+        if entry is None:
+            return
+
+        try:
+            entry[2](image)
+        except RuntimeError:
+            # 回调所属的控件已被销毁
+            pass
+
+
+download_scheduler = DownloadScheduler()
@@ -1,121 +1,173 @@
 import io
+import os
 
+import numpy as np
 from PIL import ImageOps, Image
-from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtGui import QImage, QGuiApplication
 
+from app.config import cfg
+from app.globals import GlobalsVal
+from app.utils import rgba_to_qimage
+from app.utils.tee_compositor import TeeCompositor, ddnet_color_to_rgb, BODY, BODY_SHADOW, FEET, FEET_SHADOW, EYES
+from app.utils.thumbnail_cache import thumbnail_cache
 
-def crop_and_generate_image(img):
+# 渲染结果发生变化时需要递增，使旧的缩略图缓存失效
+RENDER_VERSION = 3
+TEE_RENDERER = f"tee-v{RENDER_VERSION}"
+
+# 材质管理卡片中皮肤缩略图的显示高度
+THUMBNAIL_HEIGHT = 110
+
+
+def resize_image(image, scale):
+    width, height = image.size
+    new_width = int(width * scale)
+    new_height = int(height * scale)
+    return image.resize((new_width, new_height))
+
+
+class TeeParts:
     """
+    预先裁剪好的身体、脚与阴影图层，各表情的眼睛只在被请求时生成
+    PIL 实现的参考合成，部件位置与 TeeCompositor 共用，用于核对 TeeCompositor 的结果
     来自DDNetDiscordBot
     https://github.com/ddnet/ddnet-discordbot/blob/master/cogs/skindb.py#L115
     """
-    image = img
 
-    image_body_shadow = image.crop((96, 0, 192, 96))
-    image_feet_shadow_back = image.crop((192, 64, 255, 96))
-    image_feet_shadow_front = image.crop((192, 64, 255, 96))
-    image_body = image.crop((0, 0, 96, 96))
-    image_feet_front = image.crop((192, 32, 255, 64))
-    image_feet_back = image.crop((192, 32, 255, 64))
+    def __init__(self, image):
+        self.image = image
 
-    # default eyes
-    image_default_left_eye = image.crop((64, 96, 96, 128))
-    image_default_right_eye = image.crop((64, 96, 96, 128))
+        self.body_shadow = resize_image(image.crop(BODY_SHADOW), 0.66)
+        self.feet_shadow = image.crop(FEET_SHADOW)
+        self.body = resize_image(image.crop(BODY), 0.66)
+        self.feet = image.crop(FEET)
 
-    # evil eyes
-    image_evil_l_eye = image.crop((96, 96, 128, 128))
-    image_evil_r_eye = image.crop((96, 96, 128, 128))
+        self.tees = {}
 
-    # hurt eyes
-    image_hurt_l_eye = image.crop((128, 96, 160, 128))
-    image_hurt_r_eye = image.crop((128, 96, 160, 128))
+    def create_tee_image(self, left_eye, right_eye_flipped):
+        tee = Image.new("RGBA", (96, 64), (0, 0, 0, 0))
 
-    # happy eyes
-    image_happy_l_eye = image.crop((160, 96, 192, 128))
-    image_happy_r_eye = image.crop((160, 96, 192, 128))
+        tee.paste(self.body_shadow, (16, 0))
+        tee.paste(self.feet_shadow.convert("RGB"), (8, 30), self.feet_shadow)
+        tee.paste(self.feet_shadow.convert("RGB"), (24, 30), self.feet_shadow)
+        tee.paste(self.feet.convert("RGB"), (8, 30), self.feet)
+        tee.paste(self.body.convert("RGB"), (16, 0), self.body)
+        tee.paste(self.feet.convert("RGB"), (24, 30), self.feet)
 
-    # surprised eyes
-    image_surprised_l_eye = image.crop((224, 96, 255, 128))
-    image_surprised_r_eye = image.crop((224, 96, 255, 128))
+        tee.paste(left_eye.convert("RGB"), (39, 18), left_eye)
+        tee.paste(right_eye_flipped.convert("RGB"), (47, 18), right_eye_flipped)
 
-    def resize_image(image, scale):
-        width, height = image.size
-        new_width = int(width * scale)
-        new_height = int(height * scale)
-        return image.resize((new_width, new_height))
+        return tee
 
-    image_body_resized = resize_image(image_body, 0.66)
-    image_body_shadow_resized = resize_image(image_body_shadow, 0.66)
+    def tee(self, emote='default'):
+        """获取指定表情的TEE，同一表情只生成一次"""
+        if emote not in self.tees:
+            eye = resize_image(self.image.crop(EYES[emote]), 0.8)
+            self.tees[emote] = self.create_tee_image(eye, ImageOps.mirror(eye))
+        return self.tees[emote]
 
-    image_left_eye = resize_image(image_default_left_eye, 0.8)
-    image_right_eye = resize_image(image_default_right_eye, 0.8)
-    image_right_eye_flipped = ImageOps.mirror(image_right_eye)
 
-    image_evil_l_eye = resize_image(image_evil_l_eye, 0.8)
-    image_evil_r_eye = resize_image(image_evil_r_eye, 0.8)
-    image_evil_r_eye_flipped = ImageOps.mirror(image_evil_r_eye)
+def crop_and_generate_image(img, emotes=None):
+    """
+    生成指定表情的TEE，emotes 为空时生成全部表情
+    来自DDNetDiscordBot
+    https://github.com/ddnet/ddnet-discordbot/blob/master/cogs/skindb.py#L115
+    """
+    parts = TeeParts(img)
+    if emotes is None:
+        emotes = EYES
 
-    image_hurt_l_eye = resize_image(image_hurt_l_eye, 0.8)
-    image_hurt_r_eye = resize_image(image_hurt_r_eye, 0.8)
-    image_hurt_r_eye_flipped = ImageOps.mirror(image_hurt_r_eye)
+    return {emote: parts.tee(emote) for emote in emotes}
 
-    image_happy_l_eye = resize_image(image_happy_l_eye, 0.8)
-    image_happy_r_eye = resize_image(image_happy_r_eye, 0.8)
-    image_happy_r_eye_flipped = ImageOps.mirror(image_happy_r_eye)
 
-    image_surprised_l_eye = resize_image(image_surprised_l_eye, 0.8)
-    image_surprised_r_eye = resize_image(image_surprised_r_eye, 0.8)
-    image_surprised_r_eye_flipped = ImageOps.mirror(image_surprised_r_eye)
+def load_skin(file: str) -> np.ndarray:
+    """读取皮肤图为 RGBA 数组，保持原始分辨率，尺寸统一为 256x128 的整数倍"""
+    image = Image.open(file).convert('RGBA')
 
-    def create_tee_image(image_left_eye, image_right_eye_flipped):
-        tee = Image.new("RGBA", (96, 64), (0, 0, 0, 0))
+    scale = max(1, round(image.width / 256))
+    if image.size != (256 * scale, 128 * scale):
+        image = image.resize((256 * scale, 128 * scale))
 
-        tee.paste(image_body_shadow_resized, (16, 0))
-        tee.paste(image_feet_shadow_back.convert("RGB"), (8, 30), image_feet_shadow_back)
-        tee.paste(image_feet_shadow_front.convert("RGB"), (24, 30), image_feet_shadow_front)
-        tee.paste(image_feet_back.convert("RGB"), (8, 30), image_feet_back)
-        tee.paste(image_body_resized.convert("RGB"), (16, 0), image_body_resized)
-        tee.paste(image_feet_front.convert("RGB"), (24, 30), image_feet_front)
+    return np.asarray(image)
 
-        tee.paste(image_left_eye.convert("RGB"), (39, 18), image_left_eye)
-        tee.paste(image_right_eye_flipped.convert("RGB"), (47, 18), image_right_eye_flipped)
 
-        return tee
+def render_tee(file: str, size: int = 96, body_color=None, feet_color=None):
+    """
+    渲染 size x size 的TEE缩略图，body_color/feet_color 为 0~1 的 RGB 颜色，失败时返回 None
+    高清皮肤在原始分辨率下合成后只缩放一次
+    """
+    try:
+        compositor = TeeCompositor(load_skin(file), body_color, feet_color)
+        tee = compositor.tee('default')
+    except:
+        return None
 
-    tee_images = {
-        'default': create_tee_image(image_left_eye, image_right_eye_flipped),
-        'evil': create_tee_image(image_evil_l_eye, image_evil_r_eye_flipped),
-        'hurt': create_tee_image(image_hurt_l_eye, image_hurt_r_eye_flipped),
-        'happy': create_tee_image(image_happy_l_eye, image_happy_r_eye_flipped),
-        'surprised': create_tee_image(image_surprised_l_eye, image_surprised_r_eye_flipped)
-    }
-    return tee_images
+    scale = compositor.scale
+    final_image = np.zeros((96 * scale, 96 * scale, 4), dtype=np.uint8)
+    final_image[0:64 * scale] = tee
+    final_image = Image.fromarray(final_image, 'RGBA')
 
+    if final_image.width != size:
+        final_image = final_image.resize((size, size), Image.LANCZOS)
+    return final_image
 
-def draw_tee(file: str) -> QImage:
-    """绘制TEE"""
-    image = Image.open(file)
-    width, height = image.size
 
-    # 检查图像是否为256x128，如果不是则进行缩放
-    if width != 256 or height != 128:
-        canvas = Image.new('RGBA', (256, 128))
-        image = image.resize((256, 128))
-        canvas.paste(image, (0, 0))
-        image = canvas
+def thumbnail_size(height: int = THUMBNAIL_HEIGHT) -> int:
+    """按当前屏幕缩放计算缩略图实际需要的像素大小"""
+    app = QGuiApplication.instance()
+    ratio = app.devicePixelRatio() if app is not None else 1
+    return round(height * ratio)
 
-    try:
-        processed_images = crop_and_generate_image(image)
-    except:
-        return QImage()
 
-    final_image = Image.new('RGBA', (96, 96), )
-    final_image.paste(processed_images['default'], (0, 0))
+def tee_renderer(size: int) -> str:
+    """不同目标尺寸与缩放设置的渲染结果分别缓存"""
+    return f"{TEE_RENDERER}-{size}px-{cfg.get(cfg.dpiScale)}"
+
 
+def encode_png(image) -> bytes:
     byte_io = io.BytesIO()
-    final_image.save(byte_io, format='PNG')
-    byte_data = byte_io.getvalue()
+    image.save(byte_io, format='PNG')
+    return byte_io.getvalue()
+
+
+def tee_to_qimage(image) -> QImage:
+    return rgba_to_qimage(image.tobytes(), image.width, image.height)
+
+
+def get_cached_tee(file: str, stat=None, size: int = 96):
+    """从缩略图缓存读取TEE，未命中时返回 None"""
+    cache_file = thumbnail_cache.get(file, tee_renderer(size), stat)
+    if cache_file is not None:
+        image = QImage(cache_file)
+        if not image.isNull():
+            return image
+    return None
+
+
+def find_skin_file(name: str):
+    """在 skins 与 downloadedskins 中查找皮肤文件"""
+    for folder in ("skins", "downloadedskins"):
+        file = os.path.join(GlobalsVal.ddnet_folder, folder, f"{name}.png")
+        if os.path.isfile(file):
+            return file
+    return None
+
+
+def draw_player_tee(skin: dict, size: int = 96):
+    """按玩家的皮肤与自定义颜色设置在本地绘制TEE，找不到皮肤文件时返回 None"""
+    file = find_skin_file(skin["skin"])
+    if file is None:
+        return None
+
+    try:
+        if skin["use_custom_color"]:
+            final_image = render_tee(file, size, ddnet_color_to_rgb(skin["color_body"]), ddnet_color_to_rgb(skin["color_feet"]))
+        else:
+            final_image = render_tee(file, size)
+    except (ValueError, TypeError):
+        return None
 
-    qimage = QImage.fromData(byte_data)
+    if final_image is None:
+        return None
 
-    return QPixmap.fromImage(qimage)
\ No newline at end of file
+    return tee_to_qimage(final_image).copy()
@@ -1,8 +1,89 @@
+import struct
+from collections import namedtuple
+
 from PIL import Image
 
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+PngHeader = namedtuple('PngHeader', ['width', 'height', 'bit_depth', 'color_type'])
+
+# 各类材质的 (宽高比, 网格列数, 网格行数)，尺寸需能被网格整除
+ASSET_SPECS = {
+    "skins": ((2, 1), 8, 4),
+    "game": ((2, 1), 32, 16),
+    "emoticons": ((1, 1), 4, 4),
+    "particles": ((1, 1), 8, 8),
+    "entities": ((1, 1), 16, 16),
+    "cursor": ((1, 1), 1, 1)
+}
+
+
+def read_png_header(image_path: str):
+    """只读取 PNG 的 IHDR 块，不解码像素，非 PNG 文件返回 None"""
+    try:
+        with open(image_path, 'rb') as f:
+            data = f.read(33)
+    except OSError:
+        return None
+
+    if len(data) < 33 or data[:8] != PNG_SIGNATURE or data[12:16] != b'IHDR':
+        return None
+
+    return PngHeader(*struct.unpack('>IIBB', data[16:26]))
+
+
+def has_transparency_chunk(image_path: str) -> bool:
+    """跳过块数据查找 IDAT 之前是否存在 tRNS 块"""
+    try:
+        with open(image_path, 'rb') as f:
+            f.seek(8)
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return False
+                length, chunk_type = struct.unpack('>I4s', chunk)
+                if chunk_type == b'tRNS':
+                    return True
+                if chunk_type in (b'IDAT', b'IEND'):
+                    return False
+                f.seek(length + 4, 1)
+    except OSError:
+        return False
+
+
 def has_alpha_channel(image_path: str) -> bool:
+    header = read_png_header(image_path)
+    if header is not None:
+        # 4: 灰度+alpha 6: RGBA
+        return header.color_type in (4, 6) or has_transparency_chunk(image_path)
+
     try:
         with Image.open(image_path) as img:
             return img.mode in ("RGBA", "LA")
     except:
-        return False
\ No newline at end of file
+        return False
+
+
+def check_asset(image_path: str, asset_type: str):
+    """检查材质是否符合 DDNet 的规格，符合时返回 None，否则返回原因"""
+    header = read_png_header(image_path)
+    if header is None:
+        return "不是有效的PNG文件"
+
+    if header.width == 0 or header.height == 0:
+        return "图片尺寸为0"
+
+    if asset_type not in ASSET_SPECS:
+        return None
+
+    (ratio_w, ratio_h), grid_w, grid_h = ASSET_SPECS[asset_type]
+    if header.width * ratio_h != header.height * ratio_w:
+        return f"宽高比应为 {ratio_w}:{ratio_h}，实际为 {header.width}x{header.height}"
+
+    if header.width % grid_w != 0 or header.height % grid_h != 0:
+        return f"尺寸应能被 {grid_w}x{grid_h} 网格整除，实际为 {header.width}x{header.height}"
+
+    if asset_type == "skins" and not has_alpha_channel(image_path):
+        return "皮肤必须带有透明通道"
+
+    return None
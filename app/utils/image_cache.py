@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+from app.config import cfg
+
+
+class ImageCache:
+    """
+    所有材质页共用的已解码缩略图缓存，按 QImage 占用的字节数计算容量，超出上限时淘汰最久未使用的图像
+    每个条目记录所属的模型，隐藏或滚动后可以按模型释放；被淘汰的图像在下次绘制时重新从磁盘缓存加载
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        # 文件 -> (所属模型, QImage, 字节数)
+        self.entries = OrderedDict()
+        self.total_size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.releases = 0
+
+    def get(self, file: str):
+        entry = self.entries.get(file)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(file)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, owner, file: str, image):
+        self.remove(file)
+        size = image.sizeInBytes()
+        self.entries[file] = (owner, image, size)
+        self.total_size += size
+        self.__evict()
+
+    def remove(self, file: str):
+        entry = self.entries.pop(file, None)
+        if entry is not None:
+            self.total_size -= entry[2]
+
+    def release(self, owner, keep=()):
+        """释放 owner 的所有图像，keep 中的文件除外"""
+        for file in [file for file, entry in self.entries.items() if entry[0] is owner and file not in keep]:
+            self.remove(file)
+            self.releases += 1
+
+    def set_max_size(self, max_size: int):
+        self.max_size = max_size
+        self.__evict()
+
+    def __evict(self):
+        # 至少保留最近使用的一张，避免单张图像超出上限时反复加载
+        while self.total_size > self.max_size and len(self.entries) > 1:
+            _, (_, _, size) = self.entries.popitem(last=False)
+            self.total_size -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "count": len(self.entries),
+            "size": self.total_size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "releases": self.releases,
+        }
+
+
+image_cache = ImageCache(cfg.get(cfg.ImageCacheSize) * 1024 * 1024)
@@ -0,0 +1,72 @@
+import os
+
+
+class NameIndex:
+    """
+    文件名的三元组倒排索引，随目录变化增量增删
+    查询时取各三元组对应文件集合的交集后再校验子串，不足三个字符的查询直接扫描名称
+    设置查询后，新加入且匹配的文件会自动加入匹配结果
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.grams = {}
+        self.query = ''
+        self.matched = set()
+
+    @staticmethod
+    def trigrams(text: str) -> set:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    @staticmethod
+    def normalize(file: str) -> str:
+        return os.path.splitext(os.path.basename(file))[0].lower()
+
+    def add(self, file: str):
+        name = self.normalize(file)
+        self.names[file] = name
+        for gram in self.trigrams(name):
+            self.grams.setdefault(gram, set()).add(file)
+
+        if self.query and self.query in name:
+            self.matched.add(file)
+
+    def remove(self, file: str):
+        name = self.names.pop(file, None)
+        if name is None:
+            return
+
+        for gram in self.trigrams(name):
+            files = self.grams.get(gram)
+            if files is not None:
+                files.discard(file)
+                if not files:
+                    del self.grams[gram]
+        self.matched.discard(file)
+
+    def clear(self):
+        self.names = {}
+        self.grams = {}
+        self.matched = set()
+
+    def search(self, query: str) -> set:
+        """返回名称包含 query 的文件，不区分大小写"""
+        query = query.lower()
+        if len(query) < 3:
+            return {file for file, name in self.names.items() if query in name}
+
+        # 从最短的倒排列表开始求交集
+        postings = sorted((self.grams.get(gram, set()) for gram in self.trigrams(query)), key=len)
+        candidates = set(postings[0])
+        for files in postings[1:]:
+            if not candidates:
+                break
+            candidates &= files
+        return {file for file in candidates if query in self.names[file]}
+
+    def set_query(self, query: str):
+        self.query = query.lower()
+        self.matched = self.search(self.query) if self.query else set()
+
+    def accepts(self, file: str) -> bool:
+        return file in self.matched
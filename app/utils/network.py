@@ -1,10 +1,15 @@
+import codecs
+import json
+import re
+
 import requests
 from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtGui import QImage
 
 
 class ImageLoader(QThread):
-    finished = pyqtSignal(QPixmap)
+    """在工作线程中下载并解码图片，只产出 QImage，转换为 QPixmap 需在 GUI 线程进行"""
+    finished = pyqtSignal(QImage)
 
     def __init__(self, url):
         super().__init__()
@@ -15,11 +20,11 @@ class ImageLoader(QThread):
             response = requests.get(url=self.url)
             image_data = response.content
 
-            pixmap = QPixmap()
-            pixmap.loadFromData(image_data)
+            image = QImage()
+            image.loadFromData(image_data)
         except:
-            pixmap = QPixmap()
-        self.finished.emit(pixmap)
+            image = QImage()
+        self.finished.emit(image)
 
 
 class JsonLoader(QThread):
@@ -52,3 +57,45 @@ class HTMLoader(QThread):
             response = ''
 
         self.finished.emit(response)
+
+
+def iter_catalogue(url, section, session=None, interrupted=None):
+    """
+    流式下载并解析 teedata 的目录数据，逐个产出 section 下 items 数组中的条目，不需要等待整个文档下载完成
+    请求失败或文档不完整时抛出异常，interrupted 返回 True 时提前结束
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    # 在找到 items 数组开头之前为 None
+    pos = None
+
+    with (session or requests).get(url=url, stream=True, timeout=15) as response:
+        response.raise_for_status()
+        for data in response.iter_content(16 * 1024):
+            if interrupted is not None and interrupted():
+                return
+            buffer += text_decoder.decode(data)
+
+            if pos is None:
+                match = re.search(r'"%s"\s*:\s*\{.*?"items"\s*:\s*\[' % re.escape(section), buffer, re.S)
+                if match is None:
+                    continue
+                pos = match.end()
+
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer) and buffer[pos] == ']':
+                    return
+                try:
+                    item, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    # 条目尚未完整下载
+                    break
+                yield item
+
+            # 丢弃已经解析过的部分
+            buffer, pos = buffer[pos:], 0
+
+    raise ValueError("catalogue is incomplete")
@@ -0,0 +1,175 @@
+import io
+import os
+import threading
+
+import numpy as np
+from PIL import Image
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from app.config import config_path
+from app.utils.draw_tee import render_tee
+from app.utils.thumbnail_cache import ThumbnailCache, thumbnail_cache
+
+PALETTE_VERSION = "palette-v1"
+# RGB 每个通道量化为 4 级，共 64 个颜色格
+PALETTE_LEVELS = 4
+PALETTE_BINS = PALETTE_LEVELS ** 3
+
+
+def color_histogram(rgba: np.ndarray) -> bytes:
+    """按 alpha 加权统计缩略图的颜色分布，归一化后每格一个字节"""
+    pixels = rgba.reshape(-1, 4)
+    shift = 8 - (PALETTE_LEVELS - 1).bit_length()
+    bins = (pixels[:, 0] >> shift).astype(np.int32) * PALETTE_LEVELS ** 2 + \
+        (pixels[:, 1] >> shift).astype(np.int32) * PALETTE_LEVELS + (pixels[:, 2] >> shift)
+
+    histogram = np.bincount(bins, weights=pixels[:, 3].astype(np.float32), minlength=PALETTE_BINS)
+    total = histogram.sum()
+    if total == 0:
+        return bytes(PALETTE_BINS)
+    return np.round(histogram / total * 255).astype(np.uint8).tobytes()
+
+
+def color_weights(rgb, sigma: float = 48) -> np.ndarray:
+    """每个颜色格中心与目标颜色的相似度，距离越近权重越接近 1"""
+    step = 256 // PALETTE_LEVELS
+    centers = np.arange(PALETTE_LEVELS) * step + step / 2
+    grid = np.stack(np.meshgrid(centers, centers, centers, indexing='ij'), axis=-1).reshape(-1, 3)
+    distance = np.linalg.norm(grid - np.asarray(rgb, dtype=np.float32), axis=1)
+    return np.exp(-distance ** 2 / (2 * sigma ** 2)).astype(np.float32)
+
+
+class PaletteStore:
+    """
+    皮肤颜色分布的存储，与缩略图缓存一样以 源文件路径+修改时间+大小 为键
+    所有条目保存在同一个 npz 文件中，查询时整体作为矩阵参与计算
+    """
+
+    def __init__(self, store_file: str):
+        self.store_file = store_file
+        self.entries = {}
+        self.loaded = False
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(file: str, stat=None) -> str:
+        return ThumbnailCache.key(file, PALETTE_VERSION, stat)
+
+    def __load(self):
+        try:
+            with np.load(self.store_file) as data:
+                self.entries = {str(key): row.tobytes() for key, row in zip(data["keys"], data["histograms"])}
+        except:
+            self.entries = {}
+        self.loaded = True
+
+    def get(self, file: str, stat=None):
+        with self.lock:
+            if not self.loaded:
+                self.__load()
+            try:
+                return self.entries.get(self.key(file, stat))
+            except OSError:
+                return None
+
+    def put(self, file: str, histogram: bytes, stat=None):
+        if len(histogram) != PALETTE_BINS:
+            return
+
+        with self.lock:
+            if not self.loaded:
+                self.__load()
+            try:
+                self.entries[self.key(file, stat)] = histogram
+            except OSError:
+                return
+            self.dirty = True
+
+    def remove(self, file: str, stat=None):
+        with self.lock:
+            if not self.loaded:
+                self.__load()
+            try:
+                if self.entries.pop(self.key(file, stat), None) is not None:
+                    self.dirty = True
+            except OSError:
+                pass
+
+    def matrix(self, files: list, stats: dict) -> np.ndarray:
+        """按 files 的顺序返回 (文件数, 64) 的 uint8 矩阵，缺失的行为 0"""
+        with self.lock:
+            if not self.loaded:
+                self.__load()
+            empty = bytes(PALETTE_BINS)
+            data = b''.join(self.entries.get(self.key(file, stats[file]), empty) for file in files)
+        return np.frombuffer(data, dtype=np.uint8).reshape(len(files), PALETTE_BINS)
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+
+            keys = np.array(list(self.entries.keys()), dtype=str)
+            histograms = np.frombuffer(b''.join(self.entries.values()), dtype=np.uint8).reshape(-1, PALETTE_BINS)
+            try:
+                os.makedirs(os.path.dirname(self.store_file), exist_ok=True)
+                tmp_file = f"{self.store_file}.tmp"
+                with open(tmp_file, 'wb') as f:
+                    np.savez(f, keys=keys, histograms=histograms)
+                os.replace(tmp_file, self.store_file)
+                self.dirty = False
+            except OSError:
+                pass
+
+
+palette_store = PaletteStore(f"{config_path}/app/cache/palettes.npz")
+
+
+class PaletteFinder(QThread):
+    """
+    在工作线程中按颜色筛选皮肤，返回 [(占比, 文件)]，按占比从高到低排序
+    缺少颜色分布的皮肤优先从缩略图缓存计算，缓存中没有时才重新渲染
+    """
+    finished = pyqtSignal(list)
+
+    # 接近目标颜色的像素占比下限
+    threshold = 0.2
+
+    def __init__(self, stats: dict, rgb, renderer: str, parent=None):
+        super().__init__(parent)
+        self.stats = stats
+        self.rgb = rgb
+        self.renderer = renderer
+
+    def histogram(self, file):
+        stat = self.stats[file]
+        cache_file = thumbnail_cache.get(file, self.renderer, stat)
+        try:
+            if cache_file is not None:
+                with open(cache_file, 'rb') as f:
+                    image = Image.open(io.BytesIO(f.read())).convert('RGBA')
+            else:
+                image = render_tee(file)
+            if image is None:
+                return None
+        except:
+            return None
+
+        histogram = color_histogram(np.asarray(image))
+        palette_store.put(file, histogram, stat)
+        return histogram
+
+    def run(self):
+        files = list(self.stats)
+        for file in files:
+            if palette_store.get(file, self.stats[file]) is None:
+                self.histogram(file)
+        palette_store.save()
+
+        histograms = palette_store.matrix(files, self.stats).astype(np.float32) / 255
+        scores = histograms @ color_weights(self.rgb)
+
+        matched = np.flatnonzero(scores >= self.threshold)
+        matched = matched[np.argsort(-scores[matched], kind='stable')]
+        self.finished.emit([(float(scores[i]), files[i]) for i in matched])
@@ -18,4 +18,23 @@ def get_dummy_name():
     if dummy_name is None:
         return name_length_limit("[D] " + GlobalsVal.ddnet_setting_config.get("steam_name", "nameless tee"))
     else:
-        return dummy_name
\ No newline at end of file
+        return dummy_name
+
+
+def get_tee_skin(prefix):
+    """读取本体(player)或分身(dummy)的皮肤设置"""
+    config = GlobalsVal.ddnet_setting_config
+    return {
+        "skin": config.get(f"{prefix}_skin", "default"),
+        "use_custom_color": str(config.get(f"{prefix}_use_custom_color", "0")) == "1",
+        "color_body": config.get(f"{prefix}_color_body", "65408"),
+        "color_feet": config.get(f"{prefix}_color_feet", "65408")
+    }
+
+
+def get_player_skin():
+    return get_tee_skin("player")
+
+
+def get_dummy_skin():
+    return get_tee_skin("dummy")
@@ -0,0 +1,69 @@
+import os
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from app.utils.image_alpha_check import check_asset
+
+
+class ResourceScanner(QThread):
+    """
+    在工作线程中用 os.scandir 扫描材质目录
+    按扩展名和 PNG 文件头过滤后，将 (路径, stat) 分块发回 GUI 线程，结束时发出不符合规格的文件
+    """
+    chunk = pyqtSignal(list)
+    finished = pyqtSignal(dict)
+
+    chunk_size = 256
+    # 文件较少时也按时间间隔尽快发出已扫描的部分(秒)
+    chunk_interval = 0.05
+
+    def __init__(self, directories, asset_type, parent=None):
+        super().__init__(parent)
+        self.directories = directories
+        self.asset_type = asset_type
+
+    def run(self):
+        invalid = {}
+        entries = []
+        last_emit = time.monotonic()
+
+        for directory in self.directories:
+            try:
+                iterator = os.scandir(directory)
+            except OSError:
+                continue
+
+            with iterator:
+                for entry in iterator:
+                    if self.isInterruptionRequested():
+                        return
+
+                    if os.path.splitext(entry.name)[1].lower() != '.png':
+                        continue
+
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+
+                    reason = check_asset(entry.path, self.asset_type)
+                    if reason is not None:
+                        invalid[entry.path] = reason
+                        continue
+
+                    entries.append((entry.path, stat))
+                    if len(entries) >= self.chunk_size or time.monotonic() - last_emit > self.chunk_interval:
+                        self.chunk.emit(entries)
+                        entries = []
+                        last_emit = time.monotonic()
+
+        if entries:
+            self.chunk.emit(entries)
+        self.finished.emit(invalid)
+
+    def stop(self):
+        self.requestInterruption()
+        self.wait()
@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from app.config import config_path
+from app.utils.content_index import ContentIndex
+from app.utils.draw_tee import load_skin
+
+# 计算哈希时的灰度图尺寸 (高, 宽) 与保留的低频系数边长，哈希共 8x8=64 位
+HASH_IMAGE_SIZE = (32, 64)
+HASH_LOW_FREQ = 8
+
+
+@lru_cache(maxsize=None)
+def dct_matrix(n: int) -> np.ndarray:
+    """n 点正交 DCT-II 矩阵"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def perceptual_hash(file: str):
+    """
+    由 256x128 的标准皮肤图计算 64 位感知哈希，失败时返回 None
+    亮度在不透明像素内按排名归一化，换色、调整亮度或改变分辨率后哈希基本不变
+    """
+    try:
+        sheet = load_skin(file)
+    except:
+        return None
+
+    height, width = HASH_IMAGE_SIZE
+    image = Image.fromarray(sheet, 'RGBA').resize((width, height), Image.BOX)
+    pixels = np.asarray(image, dtype=np.float32)
+
+    alpha = pixels[..., 3] / 255
+    luminance = pixels[..., :3].mean(axis=2)
+    opaque = alpha > 0.5
+
+    rank = np.zeros_like(luminance)
+    if opaque.any():
+        order = luminance[opaque].argsort().argsort()
+        rank[opaque] = order / max(1, order.size - 1)
+    gray = (0.5 + 0.5 * rank) * alpha
+
+    coefficients = dct_matrix(height) @ gray @ dct_matrix(width).T
+    low = coefficients[:HASH_LOW_FREQ, :HASH_LOW_FREQ].flatten()
+    bits = low > np.median(low[1:])
+
+    return int(''.join('1' if i else '0' for i in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """按汉明距离组织的 BK 树，查询时利用三角不等式剪枝"""
+
+    def __init__(self):
+        # 节点为 [哈希, 文件列表, {距离: 子节点}]
+        self.root = None
+
+    def add(self, value: int, item):
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def query(self, value: int, radius: int) -> list:
+        """返回距离不超过 radius 的 (距离, 文件) 列表"""
+        results = []
+        if self.root is None:
+            return results
+
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                results.extend((distance, item) for item in node[1])
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    nodes.append(child)
+        return results
+
+
+class SimilarityIndex(ContentIndex):
+    """
+    皮肤的感知哈希索引，持久化方式与 ContentIndex 相同
+    哈希在子进程中计算，查询使用由当前文件构建的 BK 树
+    """
+    compute = staticmethod(perceptual_hash)
+
+    def __init__(self, index_file: str, max_workers=None):
+        super().__init__(index_file, max_workers or max(1, (os.cpu_count() or 2) - 1))
+        self.tree = None
+        self.tree_hashes = None
+
+    def create_executor(self):
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def similar(self, file: str, stats: dict, radius: int = 12) -> list:
+        """返回与 file 相似的 (距离, 文件) 列表，按距离排序，包含 file 本身"""
+        hashes = self.update(stats)
+        with self.lock:
+            self.save()
+
+        value = hashes.get(file)
+        if value is None:
+            return []
+
+        if hashes != self.tree_hashes:
+            tree = BKTree()
+            for path, hash_value in hashes.items():
+                tree.add(hash_value, path)
+            self.tree, self.tree_hashes = tree, hashes
+
+        return sorted(self.tree.query(value, radius))
+
+
+similarity_index = SimilarityIndex(f"{config_path}/app/cache/similarity_index.json")
+
+
+class SimilarFinder(QThread):
+    """在工作线程中更新感知哈希索引并查找相似皮肤"""
+    finished = pyqtSignal(str, list)
+
+    def __init__(self, file: str, stats: dict, parent=None):
+        super().__init__(parent)
+        self.file = file
+        self.stats = stats
+
+    def run(self):
+        try:
+            results = similarity_index.similar(self.file, self.stats)
+        except:
+            results = []
+        self.finished.emit(self.file, results)
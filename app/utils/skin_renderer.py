@@ -0,0 +1,192 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from app.utils.asset_preview import render_preview
+from app.utils.draw_tee import render_tee, encode_png
+from app.utils.palette_index import color_histogram, palette_store
+from app.utils.thumbnail_cache import thumbnail_cache
+
+
+def render_tee_batch(files, size):
+    """在子进程中渲染一批皮肤，返回 (文件, 宽, 高, RGBA数据, PNG数据, 颜色分布) 列表"""
+    results = []
+    for file in files:
+        try:
+            image = render_tee(file, size)
+        except:
+            image = None
+
+        if image is None:
+            results.append((file, 0, 0, b'', b'', b''))
+        else:
+            results.append((file, image.width, image.height, image.tobytes(), encode_png(image),
+                            color_histogram(np.asarray(image))))
+    return results
+
+
+def render_preview_batch(files, size, list_type):
+    """在子进程中生成一批非皮肤材质的预览，返回值与 render_tee_batch 相同，颜色分布为空"""
+    results = []
+    for file in files:
+        image = render_preview(file, list_type, size)
+        if image is None:
+            results.append((file, 0, 0, b'', b'', b''))
+        else:
+            results.append((file, image.width, image.height, image.tobytes(), encode_png(image), b''))
+    return results
+
+
+class SkinRenderPool(QThread):
+    """
+    多进程批量渲染缩略图，默认渲染皮肤，其他材质通过 render 传入对应的批量渲染函数
+    按完成顺序逐个发出原始 RGBA 数据，渲染结果与颜色分布同时写入缩略图缓存
+    """
+    rendered = pyqtSignal(str, int, int, bytes)
+
+    chunk_size = 8
+    idle_timeout = 5
+
+    def __init__(self, size, renderer, render=render_tee_batch, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.renderer = renderer
+        self.render = render
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.active = False
+
+    def submit(self, files):
+        for file in files:
+            self.queue.put(file)
+
+        with self.lock:
+            if self.active:
+                return
+            self.active = True
+
+        # 上一轮 run 已退出但线程可能尚未完全结束，不能在持有锁时等待
+        self.wait()
+        self.start()
+
+    def clear(self):
+        """丢弃尚未开始渲染的任务"""
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def stop(self):
+        self.clear()
+        self.requestInterruption()
+        self.wait()
+        self.active = False
+
+    def __drain(self, block):
+        files = []
+        try:
+            if block:
+                files.append(self.queue.get(timeout=0.1))
+            while True:
+                files.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return files
+
+    def __create_executor(self):
+        # 使用 spawn 避免在已有 Qt 线程的进程中 fork
+        context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def __emit(self, results):
+        for file, width, height, rgba, png, palette in results:
+            if png:
+                thumbnail_cache.put(file, self.renderer, png)
+            if palette:
+                palette_store.put(file, palette)
+            self.rendered.emit(file, width, height, rgba)
+
+    def run(self):
+        executor = self.__create_executor()
+        # future -> (这一批的文件, 是否单独渲染)
+        pending = {}
+        # 进程池损坏时未完成的文件，逐个单独渲染以找出导致损坏的文件
+        suspects = []
+        idle = 0
+
+        try:
+            while not self.isInterruptionRequested():
+                files = []
+                broken = []
+                if suspects:
+                    if not pending:
+                        batch = [suspects.pop(0)]
+                        try:
+                            pending[executor.submit(self.render, batch, self.size)] = (batch, True)
+                        except BrokenProcessPool:
+                            broken.append(batch)
+                else:
+                    files = self.__drain(block=not pending)
+                    for i in range(0, len(files), self.chunk_size):
+                        batch = files[i:i + self.chunk_size]
+                        try:
+                            pending[executor.submit(self.render, batch, self.size)] = (batch, False)
+                        except BrokenProcessPool:
+                            broken.append(batch)
+
+                if pending:
+                    idle = 0
+                    done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch, isolated = pending.pop(future)
+                        try:
+                            results = future.result()
+                        except BrokenProcessPool:
+                            if isolated:
+                                # 单独渲染时仍然损坏，按渲染失败处理
+                                self.__emit([(file, 0, 0, b'', b'', b'') for file in batch])
+                            else:
+                                broken.append(batch)
+                            continue
+                        except:
+                            results = [(file, 0, 0, b'', b'', b'') for file in batch]
+                        self.__emit(results)
+
+                if broken:
+                    # 子进程异常退出(例如内存不足被结束)后进程池无法继续使用，重建后重新提交未完成的任务
+                    for batch, _ in pending.values():
+                        broken.append(batch)
+                    pending = {}
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = self.__create_executor()
+                    for batch in broken:
+                        suspects.extend(batch)
+                    continue
+
+                if pending or suspects:
+                    continue
+
+                # 空闲一段时间后再退出，避免频繁重建进程池
+                idle += 1
+                if files or idle * 0.1 < self.idle_timeout:
+                    continue
+
+                with self.lock:
+                    if self.queue.empty():
+                        self.active = False
+                        return
+        except:
+            # 异常退出时也要允许 submit 重新启动线程
+            with self.lock:
+                self.active = False
+            raise
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,146 @@
+import colorsys
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+# 标准皮肤图(256x128)中各部件的位置 (左, 上, 右, 下)，高清皮肤按比例放大
+BODY = (0, 0, 96, 96)
+BODY_SHADOW = (96, 0, 192, 96)
+FEET = (192, 32, 255, 64)
+FEET_SHADOW = (192, 64, 255, 96)
+EYES = {
+    'default': (64, 96, 96, 128),
+    'evil': (96, 96, 128, 128),
+    'hurt': (128, 96, 160, 128),
+    'happy': (160, 96, 192, 128),
+    'surprised': (224, 96, 255, 128)
+}
+
+
+@lru_cache(maxsize=None)
+def region(box: tuple, scale: int):
+    """按皮肤的缩放倍数生成部件的切片"""
+    left, top, right, bottom = (i * scale for i in box)
+    return np.s_[top:bottom, left:right]
+
+
+def skin_scale(sheet: np.ndarray) -> int:
+    return sheet.shape[1] // 256
+
+
+# DDNet 中自定义颜色的最低亮度
+DARKEST_LGT = 0.5
+
+
+def ddnet_color_to_rgb(value) -> tuple:
+    """将 settings_ddnet.cfg 中以 HSL 打包的颜色转换为 0~1 的 RGB"""
+    value = int(value)
+    h = ((value >> 16) & 0xff) / 255
+    s = ((value >> 8) & 0xff) / 255
+    l = DARKEST_LGT + (value & 0xff) / 255 * (1 - DARKEST_LGT)
+    return colorsys.hls_to_rgb(h, l, s)
+
+
+def colorize(sheet: np.ndarray, body_color=None, feet_color=None) -> np.ndarray:
+    """
+    按 DDNet 自定义颜色模式为整张皮肤图着色
+    先转为灰度并将身体区域的主色调归一化到 192，再分别乘以身体、脚的颜色
+    """
+    scale = skin_scale(sheet)
+    body_region = region(BODY, scale)
+    sheet = sheet.copy()
+    gray = sheet[..., :3].astype(np.uint16).sum(axis=2) // 3
+
+    body = gray[body_region].astype(np.float32)
+    opaque = sheet[body_region][..., 3] > 128
+    freq = np.bincount(gray[body_region][opaque], minlength=256)
+    org_weight = int(np.argmax(freq)) if opaque.any() else 0
+    new_weight = 192
+    inv_org_weight = 255 - org_weight
+    inv_new_weight = 255 - new_weight
+
+    if org_weight == 0:
+        low = np.zeros_like(body)
+    else:
+        low = body / org_weight * new_weight
+    if inv_org_weight == 0:
+        high = np.full_like(body, new_weight)
+    else:
+        high = (body - org_weight) / inv_org_weight * inv_new_weight + new_weight
+    gray[body_region] = np.where(body <= org_weight, low, high).astype(np.uint16)
+
+    colors = np.ones(sheet.shape[:2] + (3,), dtype=np.float32)
+    if body_color is not None:
+        colors[:, :] = body_color
+    if feet_color is not None:
+        colors[region(FEET, scale)] = feet_color
+        colors[region(FEET_SHADOW, scale)] = feet_color
+
+    sheet[..., :3] = (gray[..., None] * colors).astype(np.uint8)
+    return sheet
+
+
+def resize(part: np.ndarray, scale) -> np.ndarray:
+    height, width = part.shape[:2]
+    image = Image.fromarray(np.ascontiguousarray(part), 'RGBA')
+    return np.asarray(image.resize((int(width * scale), int(height * scale))))
+
+
+def blend(dst: np.ndarray, src: np.ndarray, x: int, y: int):
+    """
+    以 src 的 alpha 为遮罩把 src 不透明地叠加到 dst 上
+    与 PIL 的 paste(src.convert("RGB"), (x, y), src) 结果一致
+    """
+    height, width = src.shape[:2]
+    target = dst[y:y + height, x:x + width]
+
+    mask = src[..., 3:4].astype(np.uint32)
+    color = src.astype(np.uint32)
+    color[..., 3] = 255
+
+    tmp = target.astype(np.uint32) * (255 - mask) + color * mask + 128
+    target[:] = ((tmp >> 8) + tmp) >> 8
+
+
+class TeeCompositor:
+    """
+    基于 NumPy 的TEE合成器
+    部件均为皮肤图上的切片视图，只有身体与眼睛的缩放会生成新数组
+    高清皮肤按原始分辨率合成，坐标随皮肤尺寸等比放大
+    """
+
+    def __init__(self, sheet: np.ndarray, body_color=None, feet_color=None):
+        if body_color is not None or feet_color is not None:
+            sheet = colorize(sheet, body_color, feet_color)
+        self.sheet = sheet
+        self.scale = skin_scale(sheet)
+
+        self.body = resize(sheet[region(BODY, self.scale)], 0.66)
+        self.body_shadow = resize(sheet[region(BODY_SHADOW, self.scale)], 0.66)
+        self.feet = sheet[region(FEET, self.scale)]
+        self.feet_shadow = sheet[region(FEET_SHADOW, self.scale)]
+
+        self.tees = {}
+
+    def tee(self, emote='default') -> np.ndarray:
+        """合成指定表情的TEE，返回 (64x96)*缩放倍数 的 RGBA 数组"""
+        if emote in self.tees:
+            return self.tees[emote]
+
+        scale = self.scale
+        eye = resize(self.sheet[region(EYES[emote], scale)], 0.8)
+
+        tee = np.zeros((64 * scale, 96 * scale, 4), dtype=np.uint8)
+        height, width = self.body_shadow.shape[:2]
+        tee[0:height, 16 * scale:16 * scale + width] = self.body_shadow
+        blend(tee, self.feet_shadow, 8 * scale, 30 * scale)
+        blend(tee, self.feet_shadow, 24 * scale, 30 * scale)
+        blend(tee, self.feet, 8 * scale, 30 * scale)
+        blend(tee, self.body, 16 * scale, 0)
+        blend(tee, self.feet, 24 * scale, 30 * scale)
+        blend(tee, eye, 39 * scale, 18 * scale)
+        blend(tee, eye[:, ::-1], 47 * scale, 18 * scale)
+
+        self.tees[emote] = tee
+        return tee
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import mmap
+import os
+
+from PyQt5.QtGui import QImage
+
+from app.config import config_path
+from app.utils import rgba_to_qimage
+
+
+class ThumbnailAtlas:
+    """
+    单个资源目录的缩略图图集
+    所有缩略图以固定大小纵向排列在同一个原始 RGBA 文件中，每个格子的数据在文件中连续，
+    打开时整体 mmap，索引记录 名称 → 区域、修改时间、大小，只有源文件发生变化的格子会被重写
+    """
+    version = 1
+
+    def __init__(self, directory: str, renderer: str, cell: int = 96, atlas_dir: str = None):
+        self.cell = cell
+        self.cell_bytes = cell * cell * 4
+
+        if atlas_dir is None:
+            atlas_dir = f"{config_path}/app/cache/atlas"
+        key = hashlib.sha1(f"{os.path.abspath(directory)}|{renderer}|{cell}".encode('utf-8')).hexdigest()
+        self.data_file = os.path.join(atlas_dir, f"{key}.rgba")
+        self.index_file = os.path.join(atlas_dir, f"{key}.json")
+
+        # 名称 -> [格子序号, 修改时间, 大小]
+        self.entries = {}
+        self.free = []
+        self.slots = 0
+        self.pending = {}
+        self.dirty = False
+        self.mmap = None
+
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.index_file, encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get("version") != self.version or index.get("cell") != self.cell:
+                raise ValueError
+            self.entries = index["entries"]
+            self.free = index["free"]
+            self.slots = index["slots"]
+        except:
+            self.entries, self.free, self.slots = {}, [], 0
+
+        self.__open_map()
+        if self.mmap is None or len(self.mmap) < self.slots * self.cell_bytes:
+            # 数据文件缺失或不完整时整体作废
+            self.__close_map()
+            self.entries, self.free, self.slots = {}, [], 0
+
+    def __open_map(self):
+        try:
+            with open(self.data_file, 'rb') as f:
+                self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.mmap = None
+
+    def __close_map(self):
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def get(self, name: str, stat) -> QImage:
+        """源文件未变化时返回缩略图，否则返回 None"""
+        entry = self.entries.get(name)
+        if entry is None or entry[1] != stat.st_mtime_ns or entry[2] != stat.st_size:
+            return None
+
+        slot = entry[0]
+        if slot in self.pending:
+            data = self.pending[slot]
+        elif self.mmap is not None:
+            offset = slot * self.cell_bytes
+            data = self.mmap[offset:offset + self.cell_bytes]
+        else:
+            return None
+
+        # 图像会经过信号存入缓存，需要持有自己的数据
+        return rgba_to_qimage(data, self.cell, self.cell).copy()
+
+    def put(self, name: str, stat, rgba: bytes):
+        if len(rgba) != self.cell_bytes:
+            return
+
+        entry = self.entries.get(name)
+        if entry is not None:
+            slot = entry[0]
+        elif self.free:
+            slot = self.free.pop()
+        else:
+            slot = self.slots
+            self.slots += 1
+
+        self.entries[name] = [slot, stat.st_mtime_ns, stat.st_size]
+        self.pending[slot] = rgba
+        self.dirty = True
+
+    def remove(self, name: str):
+        entry = self.entries.pop(name, None)
+        if entry is not None:
+            self.pending.pop(entry[0], None)
+            self.free.append(entry[0])
+            self.dirty = True
+
+    def retain(self, names):
+        """移除已经不存在于目录中的条目"""
+        for name in set(self.entries) - set(names):
+            self.remove(name)
+
+    def commit(self):
+        """把变化的格子写回图集文件并保存索引"""
+        if not self.dirty:
+            return
+
+        self.__close_map()
+        try:
+            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+            with open(self.data_file, 'r+b' if os.path.isfile(self.data_file) else 'wb') as f:
+                f.truncate(self.slots * self.cell_bytes)
+                for slot, rgba in sorted(self.pending.items()):
+                    f.seek(slot * self.cell_bytes)
+                    f.write(rgba)
+
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.version, "cell": self.cell, "slots": self.slots,
+                           "free": self.free, "entries": self.entries}, f, separators=(',', ':'))
+            os.replace(tmp_file, self.index_file)
+
+            self.pending = {}
+            self.dirty = False
+        except OSError:
+            pass
+        self.__open_map()
+
+    def close(self):
+        self.commit()
+        self.__close_map()
@@ -0,0 +1,119 @@
+import hashlib
+import os
+import threading
+
+from app.config import cfg, config_path
+
+
+class ThumbnailCache:
+    """
+    缩略图磁盘缓存
+    以 源文件路径+修改时间+大小+渲染器版本 为键保存渲染结果，超出容量上限时按最近访问时间淘汰
+    """
+
+    def __init__(self, cache_dir: str, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.total_size = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(file: str, renderer: str, stat=None) -> str:
+        if stat is None:
+            stat = os.stat(file)
+
+        raw = f"{os.path.abspath(file)}|{stat.st_mtime_ns}|{stat.st_size}|{renderer}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.png")
+
+    def get(self, file: str, renderer: str, stat=None):
+        """命中时返回缓存文件路径，未命中返回 None"""
+        try:
+            cache_file = self.path(self.key(file, renderer, stat))
+            # 刷新修改时间作为最近访问时间，供淘汰使用
+            os.utime(cache_file)
+            return cache_file
+        except OSError:
+            return None
+
+    def put(self, file: str, renderer: str, data: bytes, stat=None):
+        """写入缓存，返回缓存文件路径，写入失败返回 None"""
+        try:
+            cache_file = self.path(self.key(file, renderer, stat))
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+            old_size = os.path.getsize(cache_file) if os.path.isfile(cache_file) else 0
+            tmp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            return None
+
+        with self.lock:
+            if self.total_size is not None:
+                self.total_size += len(data) - old_size
+
+        self.prune()
+        return cache_file
+
+    def remove(self, file: str, renderer: str, stat=None):
+        try:
+            cache_file = self.path(self.key(file, renderer, stat))
+            size = os.path.getsize(cache_file)
+            os.remove(cache_file)
+        except OSError:
+            return
+
+        with self.lock:
+            if self.total_size is not None:
+                self.total_size -= size
+
+    def set_max_size(self, max_size: int):
+        self.max_size = max_size
+        self.prune()
+
+    def __scan(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                file = os.path.join(root, name)
+                try:
+                    stat = os.stat(file)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, file))
+        return entries
+
+    def prune(self):
+        """超出容量上限时删除最久未访问的缓存，直到回落到上限的 80%"""
+        with self.lock:
+            if self.total_size is None:
+                self.total_size = sum(size for _, size, _ in self.__scan())
+
+            if self.total_size <= self.max_size:
+                return
+
+            target = self.max_size * 0.8
+            for _, size, file in sorted(self.__scan()):
+                if self.total_size <= target:
+                    break
+                try:
+                    os.remove(file)
+                    self.total_size -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self.lock:
+            for _, _, file in self.__scan():
+                try:
+                    os.remove(file)
+                except OSError:
+                    pass
+            self.total_size = 0
+
+
+thumbnail_cache = ThumbnailCache(f"{config_path}/app/cache/thumbnails", cfg.get(cfg.ThumbnailCacheSize) * 1024 * 1024)
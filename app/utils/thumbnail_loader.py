@@ -0,0 +1,207 @@
+import os
+from functools import partial
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer, QElapsedTimer
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+from app.utils import rgba_to_qimage
+from app.utils.asset_preview import preview_renderer
+from app.utils.draw_tee import get_cached_tee, thumbnail_size, tee_renderer
+from app.utils.palette_index import color_histogram, palette_store
+from app.utils.skin_renderer import SkinRenderPool, render_preview_batch, render_tee_batch
+from app.utils.thumbnail_atlas import ThumbnailAtlas
+from app.utils.thumbnail_cache import thumbnail_cache
+
+
+class ThumbnailLoader(QObject):
+    """
+    材质缩略图的按需加载器
+    皮肤依次从图集、缩略图缓存中读取；其余材质只截取有代表性的区域作为预览，从缩略图缓存中读取
+    都未命中时交给渲染进程池，图像在子进程中解码
+    请求在事件循环中按时间片处理，加载完成后发出 loaded，失败时发出空的 QImage
+    """
+    loaded = pyqtSignal(str, QImage)
+
+    # 每次处理请求的时间预算(毫秒)
+    tick_budget = 8
+
+    def __init__(self, list_type, directories, height, parent=None):
+        super().__init__(parent)
+        self.list_type = list_type
+        self.size = thumbnail_size(height)
+
+        self.pending = {}
+        self.rendering = {}
+        self.paused = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.__process)
+
+        # 按屏幕缩放渲染对应像素大小的缩略图，高分屏上同样清晰
+        if self.list_type == "skins":
+            self.renderer = tee_renderer(self.size)
+            render = render_tee_batch
+            self.atlases = {i: ThumbnailAtlas(i, self.renderer, self.size) for i in directories}
+            self.atlas_timer = QTimer(self)
+            self.atlas_timer.setSingleShot(True)
+            self.atlas_timer.setInterval(2000)
+            self.atlas_timer.timeout.connect(self.commit)
+        else:
+            self.renderer = preview_renderer(self.list_type, self.size)
+            render = partial(render_preview_batch, list_type=self.list_type)
+
+        self.render_pool = SkinRenderPool(self.size, self.renderer, render, parent=self)
+        self.render_pool.rendered.connect(self.__on_rendered)
+        QApplication.instance().aboutToQuit.connect(self.stop)
+        # 所在列表销毁时一并停止
+        self.destroyed.connect(lambda: self.stop())
+
+    def request(self, file, stat=None):
+        if file in self.pending or file in self.rendering:
+            return
+
+        self.pending[file] = stat
+        if not self.paused and not self.timer.isActive():
+            self.timer.start()
+
+    def pause(self):
+        """暂停加载，尚未开始渲染的文件放回等待队列"""
+        self.paused = True
+        self.timer.stop()
+        self.render_pool.clear()
+        self.pending.update(self.rendering)
+        self.rendering = {}
+
+    def resume(self):
+        self.paused = False
+        if self.pending:
+            self.timer.start()
+
+    def is_idle(self):
+        return not self.pending and not self.rendering
+
+    def clear(self):
+        """丢弃所有未完成的请求"""
+        self.pending = {}
+        self.rendering = {}
+        self.render_pool.clear()
+
+    def __process(self):
+        elapsed = QElapsedTimer()
+        elapsed.start()
+
+        while self.pending and elapsed.elapsed() < self.tick_budget:
+            file = next(iter(self.pending))
+            stat = self.pending.pop(file)
+
+            image = self.__load(file, stat)
+            if image is not None:
+                self.loaded.emit(file, image)
+
+        if self.pending:
+            self.timer.start()
+
+    def __load(self, file, stat):
+        try:
+            if stat is None:
+                stat = os.stat(file)
+        except OSError:
+            return QImage()
+
+        if self.list_type != "skins":
+            cache_file = thumbnail_cache.get(file, self.renderer, stat)
+            if cache_file is not None:
+                image = QImage(cache_file)
+                if not image.isNull():
+                    return image
+
+            self.rendering[file] = stat
+            self.render_pool.submit([file])
+            return None
+
+        directory, name = os.path.split(file)
+        image = self.atlases[directory].get(name, stat)
+        if image is not None:
+            self.ensure_palette(file, stat, image)
+            return image
+
+        image = get_cached_tee(file, stat, self.size)
+        if image is not None:
+            self.put_atlas(file, stat, image)
+            self.ensure_palette(file, stat, image)
+            return image
+
+        self.rendering[file] = stat
+        self.render_pool.submit([file])
+        return None
+
+    def __on_rendered(self, file, width, height, rgba):
+        stat = self.rendering.pop(file, None)
+        if stat is None:
+            return
+
+        if not rgba:
+            self.loaded.emit(file, QImage())
+            return
+
+        image = rgba_to_qimage(rgba, width, height).copy()
+        if self.list_type == "skins":
+            self.put_atlas(file, stat, image)
+        self.loaded.emit(file, image)
+
+    @staticmethod
+    def ensure_palette(file, stat, image):
+        """缓存的缩略图没有颜色分布时直接由缩略图计算"""
+        if palette_store.get(file, stat) is not None:
+            return
+
+        image = image.convertToFormat(QImage.Format_RGBA8888)
+        rgba = np.frombuffer(image.bits().asstring(image.sizeInBytes()), dtype=np.uint8)
+        palette_store.put(file, color_histogram(rgba.reshape(-1, 4)), stat)
+
+    def put_atlas(self, file, stat, image):
+        directory, name = os.path.split(file)
+        image = image.convertToFormat(QImage.Format_RGBA8888)
+        self.atlases[directory].put(name, stat, image.bits().asstring(image.sizeInBytes()))
+        self.atlas_timer.start()
+
+    def forget(self, file, stat):
+        """文件被删除或修改后丢弃其未完成的请求以及图集、缓存中的旧缩略图"""
+        self.pending.pop(file, None)
+        self.rendering.pop(file, None)
+        thumbnail_cache.remove(file, self.renderer, stat)
+        if self.list_type != "skins":
+            return
+
+        directory, name = os.path.split(file)
+        self.atlases[directory].remove(name)
+        self.atlas_timer.start()
+        palette_store.remove(file, stat)
+
+    def retain(self, files):
+        """清理图集中已经不存在的文件"""
+        if self.list_type != "skins":
+            return
+
+        for directory, atlas in self.atlases.items():
+            atlas.retain(os.path.basename(i) for i in files if os.path.dirname(i) == directory)
+        self.commit()
+
+    def commit(self):
+        if self.list_type == "skins":
+            for atlas in self.atlases.values():
+                atlas.commit()
+            palette_store.save()
+
+    def stop(self):
+        """停止渲染，写回并关闭图集的内存映射"""
+        self.clear()
+        self.render_pool.stop()
+        if self.list_type == "skins":
+            for atlas in self.atlases.values():
+                atlas.close()
+            palette_store.save()
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from app.config import cfg, config_path
+
+
+class Trash:
+    """
+    删除文件的暂存区，每次删除的文件放在一个批次目录中，并记录原路径
+    最近一次删除可以整体恢复，其余批次超出容量上限或保存时间后按时间从旧到新彻底删除
+    """
+    manifest_name = "manifest.json"
+    # 批次的最长保存时间(秒)
+    max_age = 7 * 24 * 3600
+
+    def __init__(self, trash_dir: str, max_size: int):
+        self.trash_dir = trash_dir
+        self.max_size = max_size
+        self.last_batch = None
+        self.lock = threading.Lock()
+
+    def batch_dir(self, batch: str) -> str:
+        return os.path.join(self.trash_dir, batch)
+
+    def __write_manifest(self, batch: str, files: list):
+        manifest_file = os.path.join(self.batch_dir(batch), self.manifest_name)
+        tmp_file = f"{manifest_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"created": time.time(), "files": files}, f, ensure_ascii=False)
+        os.replace(tmp_file, manifest_file)
+
+    def __read_manifest(self, batch: str) -> dict:
+        try:
+            with open(os.path.join(self.batch_dir(batch), self.manifest_name), encoding='utf-8') as f:
+                return json.load(f)
+        except:
+            return {}
+
+    def move(self, files: list):
+        """
+        将文件移入一个新批次，返回 (批次, 已移动的文件, [(文件, 原因)])
+        同一磁盘上为重命名，跨磁盘时退化为复制后删除
+        """
+        with self.lock:
+            batch = str(time.time_ns())
+            os.makedirs(self.batch_dir(batch), exist_ok=True)
+
+            moved = []
+            records = []
+            failed = []
+            for i, file in enumerate(files):
+                stored = f"{i}_{os.path.basename(file)}"
+                try:
+                    shutil.move(file, os.path.join(self.batch_dir(batch), stored))
+                except Exception as e:
+                    failed.append((file, str(e)))
+                    continue
+                moved.append(file)
+                records.append([file, stored])
+
+            if moved:
+                try:
+                    self.__write_manifest(batch, records)
+                except OSError:
+                    pass
+            else:
+                shutil.rmtree(self.batch_dir(batch), ignore_errors=True)
+
+            self.last_batch = batch if moved else None
+            return batch, moved, failed
+
+    def restore(self, batch: str):
+        """将批次中的文件移回原路径，返回 (已恢复的文件, [(文件, 原因)])，原路径已有同名文件时跳过"""
+        with self.lock:
+            records = self.__read_manifest(batch).get("files", [])
+
+            restored = []
+            failed = []
+            remaining = []
+            for file, stored in records:
+                try:
+                    if os.path.exists(file):
+                        raise FileExistsError(file)
+                    os.makedirs(os.path.dirname(file), exist_ok=True)
+                    shutil.move(os.path.join(self.batch_dir(batch), stored), file)
+                except Exception as e:
+                    failed.append((file, str(e)))
+                    remaining.append([file, stored])
+                    continue
+                restored.append(file)
+
+            if remaining:
+                try:
+                    self.__write_manifest(batch, remaining)
+                except OSError:
+                    pass
+            else:
+                shutil.rmtree(self.batch_dir(batch), ignore_errors=True)
+
+            if batch == self.last_batch:
+                self.last_batch = None
+            return restored, failed
+
+    def set_max_size(self, max_size: int):
+        self.max_size = max_size
+        self.purge()
+
+    def __scan(self):
+        """返回 [(创建时间, 大小, 批次)]"""
+        try:
+            batches = [i for i in os.listdir(self.trash_dir) if os.path.isdir(self.batch_dir(i))]
+        except OSError:
+            return []
+
+        entries = []
+        for batch in batches:
+            created = self.__read_manifest(batch).get("created")
+            size = 0
+            for root, _, files in os.walk(self.batch_dir(batch)):
+                for name in files:
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    size += stat.st_size
+                    if created is None:
+                        created = stat.st_mtime
+            entries.append((created or 0, size, batch))
+        return entries
+
+    def purge(self):
+        """删除超过保存时间的批次，总大小超出上限时再从最旧的批次开始删除，最近一次删除始终保留"""
+        with self.lock:
+            entries = sorted(self.__scan())
+            total = sum(size for _, size, _ in entries)
+            deadline = time.time() - self.max_age
+
+            for created, size, batch in entries:
+                if batch == self.last_batch:
+                    continue
+                if created >= deadline and total <= self.max_size:
+                    break
+                shutil.rmtree(self.batch_dir(batch), ignore_errors=True)
+                total -= size
+
+
+trash = Trash(f"{config_path}/app/trash", cfg.get(cfg.TrashSize) * 1024 * 1024)
+
+
+class TrashMover(QThread):
+    """在工作线程中将文件移入回收区，并清理超出容量的旧批次"""
+    finished = pyqtSignal(str, list, list)
+
+    def __init__(self, files: list, parent=None):
+        super().__init__(parent)
+        self.files = files
+
+    def run(self):
+        batch, moved, failed = trash.move(self.files)
+        trash.purge()
+        self.finished.emit(batch, moved, failed)
+
+
+class TrashPurger(QThread):
+    """在工作线程中清理超出容量或保存时间的批次"""
+
+    def run(self):
+        trash.purge()
+
+
+class TrashRestorer(QThread):
+    """在工作线程中恢复一个批次的文件"""
+    finished = pyqtSignal(list, list)
+
+    def __init__(self, batch: str, parent=None):
+        super().__init__(parent)
+        self.batch = batch
+
+    def run(self):
+        restored, failed = trash.restore(self.batch)
+        self.finished.emit(restored, failed)
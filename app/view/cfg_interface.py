@@ -1,5 +1,4 @@
 import os
-import shutil
 from functools import partial
 
 from PyQt5.QtCore import Qt
@@ -9,6 +8,7 @@ from qfluentwidgets import TableWidget, CommandBar, Action, FluentIcon, InfoBar,
 
 from app.config import cfg
 from app.globals import GlobalsVal
+from app.utils.asset_importer import AssetImporter
 
 
 class CFGSelectMessageBox(MessageBoxBase):
@@ -75,6 +75,7 @@ class CFGInterface(QWidget):
         self.vBoxLayout = QVBoxLayout(self)
         self.commandBar = CommandBar(self)
         self.table = TableWidget(self)
+        self.asset_importer = None
 
         self.vBoxLayout.addWidget(TitleLabel(self.tr('CFG管理'), self))
         self.setLayout(self.vBoxLayout)
@@ -111,6 +112,46 @@ class CFGInterface(QWidget):
         self.vBoxLayout.addWidget(self.commandBar)
         self.vBoxLayout.addWidget(self.table)
 
+    def import_files(self, files):
+        if self.asset_importer is not None:
+            return
+
+        self.asset_importer = AssetImporter(files, GlobalsVal.ddnet_folder, extensions=('.cfg',), parent=self)
+        self.asset_importer.finished.connect(self.__on_import_finished)
+        self.asset_importer.start()
+
+    def __on_import_finished(self, result):
+        self.asset_importer.wait()
+        self.asset_importer.deleteLater()
+        self.asset_importer = None
+
+        errors = result["errors"]
+        if errors:
+            content = "\n".join(self.tr("文件 {} 复制失败\n原因：{}").format(name, reason) for name, reason in errors[:3])
+            if len(errors) > 3:
+                content += self.tr("\n以及其他 {} 个文件").format(len(errors) - 3)
+            InfoBar.error(
+                title=self.tr('错误'),
+                content=content,
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=-1,
+                parent=GlobalsVal.main_window
+            )
+
+        InfoBar.success(
+            title='成功',
+            content=self.tr("文件复制已完成\n共复制了 {} 个文件，{} 个文件被覆盖，{} 个文件失败").format(
+                result["copied"], result["covered"], len(errors)),
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=2000,
+            parent=GlobalsVal.main_window
+        )
+        self.Button_clicked("刷新")
+
     def addButton(self, icon, text, text_type):
         action = Action(icon, text, self)
         action.triggered.connect(partial(self.Button_clicked, text_type))
@@ -132,36 +173,7 @@ class CFGInterface(QWidget):
                         parent=GlobalsVal.main_window
                     )
                 else:
-                    errors = 0
-                    cover = 0
-                    for i in files:
-                        if i.split("/")[-1] in [file for file in os.listdir(GlobalsVal.ddnet_folder) if file.endswith('.cfg')]:
-                            cover += 1
-
-                        try:
-                            shutil.copy(i, GlobalsVal.ddnet_folder)
-                        except Exception as e:
-                            InfoBar.error(
-                                title=self.tr('错误'),
-                                content=self.tr("文件 {} 复制失败\n原因：{}").format(i, e),
-                                orient=Qt.Horizontal,
-                                isClosable=True,
-                                position=InfoBarPosition.BOTTOM_RIGHT,
-                                duration=-1,
-                                parent=GlobalsVal.main_window
-                            )
-                            errors += 1
-
-                    InfoBar.success(
-                        title='成功',
-                        content=self.tr("文件复制已完成\n共复制了 {} 个文件，{} 个文件被覆盖，{} 个文件失败").format(len(files), cover, errors),
-                        orient=Qt.Horizontal,
-                        isClosable=True,
-                        position=InfoBarPosition.BOTTOM_RIGHT,
-                        duration=2000,
-                        parent=GlobalsVal.main_window
-                    )
-                    self.Button_clicked("刷新")
+                    self.import_files(files)
         elif text == "删除":
             selected_items = self.table.selectedItems()
             if selected_items == []:
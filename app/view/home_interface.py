@@ -4,14 +4,16 @@ import requests
 from app.globals import GlobalsVal
 from app.config import cfg, base_path
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
 from PyQt5.QtWidgets import QVBoxLayout, QWidget, QHBoxLayout, QSpacerItem, QSizePolicy, QLabel, \
     QStackedWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QFrame, QTableWidget
 from qfluentwidgets import ImageLabel, CardWidget, SubtitleLabel, BodyLabel, HeaderCardWidget, InfoBar, InfoBarPosition, \
     CaptionLabel, SingleDirectionScrollArea, ToolTipFilter, ToolTipPosition, Pivot, TableWidget, SmoothMode, \
     ComboBox, StrongBodyLabel, SearchLineEdit
 
+from app.utils.draw_tee import draw_player_tee, thumbnail_size
 from app.utils.network import ImageLoader
-from app.utils.player_name import get_player_name, get_dummy_name
+from app.utils.player_name import get_player_name, get_dummy_name, get_player_skin, get_dummy_skin
 
 
 class TEEDataLoader(QThread):
@@ -52,9 +54,10 @@ class CheckUpdate(QThread):
 class TEECard(CardWidget):
     ref_status = True
 
-    def __init__(self, name: str, tee_info_ready=None, parent=None):
+    def __init__(self, name: str, tee_info_ready=None, skin=None, parent=None):
         super().__init__(parent)
         self.tee_info_ready = tee_info_ready
+        self.skin = skin
 
         self.setToolTip(self.tr('单击刷新数据'))
         self.setToolTipDuration(1000)
@@ -89,9 +92,7 @@ class TEECard(CardWidget):
 
         self.hBoxLayout.addLayout(self.vBoxLayout)
 
-        self.image_loader = ImageLoader('https://xc.null.red:8043/api/ddnet/draw_player_skin?name={}'.format(name))
-        self.image_loader.finished.connect(self.on_image_loaded)
-        self.image_loader.start()
+        self.load_tee_image()
 
         self.data_loader = TEEDataLoader(name)
         self.data_loader.finished.connect(self.on_data_loaded)
@@ -111,16 +112,25 @@ class TEECard(CardWidget):
                                        '最后完成：加载中...\n'
                                        '入坑时间：加载中...'))
 
-        self.image_loader = ImageLoader('https://xc.null.red:8043/api/ddnet/draw_player_skin?name={}'.format(self.name))
-        self.image_loader.finished.connect(self.on_image_loaded)
-        self.image_loader.start()
+        self.load_tee_image()
 
         self.data_loader = TEEDataLoader(self.name)
         self.data_loader.finished.connect(self.on_data_loaded)
         self.data_loader.start()
 
-    def on_image_loaded(self, pixmap):
-        self.iconWidget.setPixmap(pixmap)
+    def load_tee_image(self):
+        # 本地能找到皮肤时按自定义颜色直接绘制，否则从服务器获取
+        image = draw_player_tee(self.skin, thumbnail_size(120)) if self.skin is not None else None
+        if image is not None:
+            self.on_image_loaded(image)
+            return
+
+        self.image_loader = ImageLoader('https://xc.null.red:8043/api/ddnet/draw_player_skin?name={}'.format(self.name))
+        self.image_loader.finished.connect(self.on_image_loaded)
+        self.image_loader.start()
+
+    def on_image_loaded(self, image: QImage):
+        self.iconWidget.setPixmap(QPixmap.fromImage(image))
         self.iconWidget.scaledToHeight(120)
 
     def on_data_loaded(self, json_data: dict):
@@ -476,5 +486,5 @@ class HomeInterface(QWidget):
             widget = self.hBoxLayout.itemAt(i).widget()
             self.hBoxLayout.removeWidget(widget)
             widget.deleteLater()
-        self.hBoxLayout.addWidget(TEECard(player_name, self.teeinfolist.homePlayerInterface.tee_data), alignment=Qt.AlignTop)
-        self.hBoxLayout.addWidget(TEECard(dummy_name, self.teeinfolist.homeDummyInterface.tee_data), alignment=Qt.AlignTop)
\ No newline at end of file
+        self.hBoxLayout.addWidget(TEECard(player_name, self.teeinfolist.homePlayerInterface.tee_data, get_player_skin()), alignment=Qt.AlignTop)
+        self.hBoxLayout.addWidget(TEECard(dummy_name, self.teeinfolist.homeDummyInterface.tee_data, get_dummy_skin()), alignment=Qt.AlignTop)
\ No newline at end of file
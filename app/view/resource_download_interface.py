@@ -1,27 +1,25 @@
 import os
-import re
 import shutil
 from functools import partial
 
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
-from PyQt5.QtGui import QFontMetrics, QPainter, QBrush, QPainterPath, QPixmap
+from PyQt5.QtGui import QFontMetrics, QPainter, QBrush, QPainterPath, QPixmap, QImage
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QStackedWidget, QLabel, QFileDialog, QHBoxLayout
 from qfluentwidgets import CommandBar, Action, FluentIcon, InfoBar, InfoBarPosition, Pivot, TitleLabel, CardWidget, \
     ImageLabel, CaptionLabel, FlowLayout, SingleDirectionScrollArea, MessageBoxBase, SubtitleLabel, MessageBox, \
     SearchLineEdit, TogglePushButton, ToolTipFilter, ToolTipPosition, setFont, IndeterminateProgressRing, InfoBadge, \
     InfoBadgePosition
-from win32comext.mapi.mapitags import PR_DELTAX
 
 from app.config import cfg, base_path, config_path
 from app.globals import GlobalsVal
-from app.utils.draw_tee import draw_tee
-from app.utils.network import JsonLoader, ImageLoader, HTMLoader
+from app.utils.download_scheduler import download_scheduler
+from app.utils.catalogue_store import CatalogueSync, catalogue_store
 
 select_list = {
     "skins": {},
-    "game": {},
+    "gameskins": {},
     "emoticons": {},
-    "cursor": {},
+    "cursors": {},
     "particles": {},
     "entities": {}
 }
@@ -41,14 +39,16 @@ class ResourceCard(CardWidget):
         self.setFixedSize(135, 120)
 
         if self.card_type == "skins":
-            self.image_load = ImageLoader(f"https://teedata.net/api/skin/render/name/{data['name']}?emotion=default_eye")
-            self.spinner = IndeterminateProgressRing()
+            self.url = f"https://teedata.net/api/skin/render/name/{data['name']}?emotion=default_eye"
         else:
-            self.image_load = ImageLoader(f"https://teedata.net/databasev2{data['file_path']}")
-            self.spinner = IndeterminateProgressRing()
+            self.url = f"https://teedata.net/databasev2{data['file_path']}"
+        self.spinner = IndeterminateProgressRing()
 
-        self.image_load.finished.connect(self.__on_image_load)
-        self.image_load.start()
+        # 图片由所在列表按可见性请求
+        self.image_task = None
+        self.image_loaded = False
+        # 卡片销毁时取消尚未完成的下载
+        self.destroyed.connect(lambda: self.cancel_image())
 
         self.label = CaptionLabel(self)
         self.label.setText(self.get_elided_text(self.label, self.data['name']))
@@ -63,8 +63,24 @@ class ResourceCard(CardWidget):
 
         self.clicked.connect(self.__on_clicked)
 
-    def __on_image_load(self, pixmap: QPixmap):
-        self.iconWidget = ImageLabel(pixmap)
+    def request_image(self, priority):
+        if self.image_loaded:
+            return
+
+        if self.image_task is None:
+            self.image_task = download_scheduler.request(self.url, self.__on_image_load, priority)
+        else:
+            download_scheduler.set_priority(self.image_task, priority)
+
+    def cancel_image(self):
+        if self.image_task is not None:
+            download_scheduler.cancel(self.image_task)
+            self.image_task = None
+
+    def __on_image_load(self, image: QImage):
+        self.image_task = None
+        self.image_loaded = True
+        self.iconWidget = ImageLabel(QPixmap.fromImage(image))
 
         self.vBoxLayout.replaceWidget(self.spinner, self.iconWidget)
         self.spinner.deleteLater()
@@ -114,10 +130,20 @@ class ResourceCard(CardWidget):
 
 
 class ResourceList(SingleDirectionScrollArea):
+    """
+    在线材质列表，卡片的图片按可见性请求下载
+    可见区域内的卡片最先下载，上下各一屏内的卡片按距离排在其后，更远的卡片以及隐藏列表中的卡片取消下载
+    条目从本地目录镜像读取，卡片按页创建，滚动到接近底部时才创建下一页
+    镜像中还没有该分类时，直接显示同步过程中边下载边解析出的条目
+    """
     refresh_resource = pyqtSignal()
     data_ready = pyqtSignal()
-    batch_size = 1
+    # 每次事件循环创建的卡片数与每页的卡片数
+    batch_size = 20
+    page_size = 60
     current_index = 0
+    # 滚动、缩放后重新计算下载优先级的合并间隔(毫秒)
+    request_delay = 50
 
     def __init__(self, list_type, parent=None):
         super().__init__(parent)
@@ -142,50 +168,181 @@ class ResourceList(SingleDirectionScrollArea):
         self.enableTransparentBackground()
         self.setWidget(self.containerWidget)
 
+        self.teedata_list = []
+        self.limit = self.page_size
+        self.query = ''
+        # 正在直接显示同步过程中下载的条目
+        self.streaming = False
+
         self.refresh_resource.connect(self.__refresh)
         self.data_ready.connect(self.__data_ready)
 
+        self.batch_timer = QTimer(self)
+        self.batch_timer.setSingleShot(True)
+        self.batch_timer.setInterval(0)
+        self.batch_timer.timeout.connect(self.load_next_batch)
+
+        self.request_timer = QTimer(self)
+        self.request_timer.setSingleShot(True)
+        self.request_timer.setInterval(self.request_delay)
+        self.request_timer.timeout.connect(self.update_requests)
+        self.verticalScrollBar().valueChanged.connect(lambda: self.request_timer.start())
+
+    def cards(self):
+        for i in range(self.fBoxLayout.count()):
+            widget = self.fBoxLayout.itemAt(i).widget()
+            if isinstance(widget, ResourceCard):
+                yield widget
+
+    def update_requests(self):
+        """按卡片与可见区域的距离设置下载优先级，距离超过一屏的卡片取消下载"""
+        if not self.isVisible():
+            return
+
+        self.check_more()
+        top = -self.containerWidget.y()
+        height = self.viewport().height()
+        bottom = top + height
+        for card in self.cards():
+            if card.image_loaded:
+                continue
+
+            geometry = card.geometry()
+            distance = max(0, top - geometry.bottom(), geometry.top() - bottom)
+            if distance > height:
+                card.cancel_image()
+            else:
+                card.request_image(distance)
+
+    def cancel_requests(self):
+        for card in self.cards():
+            card.cancel_image()
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.request_timer.start()
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        self.request_timer.stop()
+        self.cancel_requests()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self.request_timer.start()
+
+    def check_more(self):
+        """当前页已创建完且可见区域接近底部时，开始创建下一页"""
+        if self.current_index < self.limit or self.current_index >= len(self.teedata_list):
+            return
+
+        bar = self.verticalScrollBar()
+        if bar.maximum() - bar.value() <= self.viewport().height():
+            self.limit += self.page_size
+            self.batch_timer.start()
+
     def load_next_batch(self):
-        end_index = min(self.current_index + self.batch_size, len(self.teedata_list))
+        end_index = min(self.current_index + self.batch_size, len(self.teedata_list), self.limit)
         for i in range(self.current_index, end_index):
             self.fBoxLayout.addWidget(ResourceCard(self.teedata_list[i], self.list_type))
         self.current_index = end_index
+        # 布局完成后再计算下载优先级并检查是否需要下一页
+        if not self.request_timer.isActive():
+            self.request_timer.start()
 
-        if self.current_index < len(self.teedata_list):
-            QTimer.singleShot(0, self.load_next_batch)
+        if self.current_index < min(len(self.teedata_list), self.limit):
+            self.batch_timer.start()
 
-    def __refresh(self):
+    def clear_cards(self):
         for i in reversed(range(self.fBoxLayout.count())):
             widget = self.fBoxLayout.itemAt(i).widget()
             if widget:
                 self.fBoxLayout.removeWidget(widget)
                 widget.deleteLater()
 
-        self.file_list = os.listdir(self.file_path)
         self.current_index = 0
+        self.limit = self.page_size
+        select_list[self.list_type].clear()
+
+    def __refresh(self):
+        self.clear_cards()
+        self.file_list = os.listdir(self.file_path)
+
+        self.batch_timer.start()
 
-        QTimer.singleShot(0, self.load_next_batch)
+    def set_items(self, items):
+        self.teedata_list = items
+        self.clear_cards()
+        self.verticalScrollBar().setValue(0)
+        self.batch_timer.start()
 
-    def __data_ready(self, data=None):
-        if data is None:
-            self.teedata = JsonLoader(f"https://teedata.net/_next/data/{GlobalsVal.teedata_build_id}/{self.list_type}.json")
-            self.teedata.finished.connect(self.__data_ready)
-            self.teedata.start()
+    def __data_ready(self):
+        self.set_items(catalogue_store.search(self.list_type, self.query))
+        self.streaming = not self.teedata_list and not self.query
+
+    def search(self, query):
+        query = query.strip()
+        if query == self.query:
             return
 
-        if self.list_type == 'skins':
-            self.teedata_list = data['pageProps']['skins']['items']
-        else:
-            self.teedata_list = data['pageProps']['assets']['items']
+        self.query = query
+        self.streaming = False
+        self.set_items(catalogue_store.search(self.list_type, self.query))
+
+    def begin_sync(self):
+        """开始新的同步前丢弃上次未同步完成时直接显示的条目，避免重复"""
+        if self.streaming and self.teedata_list:
+            self.set_items([])
+
+    def on_catalogue_chunk(self, items):
+        if not self.streaming:
+            return
+
+        self.teedata_list.extend(items)
+        if self.current_index < self.limit:
+            self.batch_timer.start()
+
+    def on_catalogue_synced(self, changed):
+        if self.streaming:
+            # 已经显示了同步下载的全部条目
+            self.streaming = False
+            return
+
+        if changed:
+            self.apply_items(catalogue_store.search(self.list_type, self.query))
 
-        QTimer.singleShot(0, self.load_next_batch)
-        # print(data)
+    def apply_items(self, items):
+        """后台同步有变化时原地更新已创建的卡片，内容未变的卡片连同图片保留，不重置滚动位置"""
+        cards = {card.file: card for card in self.cards()}
+        self.fBoxLayout.removeAllWidgets()
+
+        count = min(self.current_index, len(items))
+        for item in items[:count]:
+            card = cards.pop(item['name'], None)
+            if card is None or card.data != item:
+                if card is not None:
+                    cards[card.file] = card
+                card = ResourceCard(item, self.list_type)
+            self.fBoxLayout.addWidget(card)
+
+        for card in cards.values():
+            select_list[self.list_type].pop(card.file, None)
+            card.deleteLater()
+
+        self.teedata_list = items
+        self.current_index = count
+        if self.current_index < min(len(self.teedata_list), self.limit):
+            self.batch_timer.start()
+        self.request_timer.start()
 
 
 class ResourceDownloadInterface(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("ResourceDownloadInterface")
+        self.catalogue_sync = None
+        # 没有找到 DDNet 配置目录时不显示在线材质
+        self.loaded = not GlobalsVal.ddnet_folder_status
 
         if not GlobalsVal.ddnet_folder_status:
             self.label = SubtitleLabel("我们的程序无法自动找到DDNet配置目录\n请手动到设置中指定DDNet配置目录", self)
@@ -206,6 +363,13 @@ class ResourceDownloadInterface(QWidget):
 
         self.search_edit = SearchLineEdit()
         self.search_edit.setPlaceholderText('搜点什么...')
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.__search)
+        self.search_edit.textChanged.connect(lambda: self.search_timer.start())
+        self.search_edit.searchSignal.connect(self.__search)
+        self.search_edit.clearSignal.connect(self.__search)
 
         self.commandBar = CommandBar(self)
         self.commandBar.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
@@ -240,28 +404,69 @@ class ResourceDownloadInterface(QWidget):
         self.pivot.setCurrentItem(self.TeedataSkinsInterface.objectName())
         self.pivot.currentItemChanged.connect(lambda k: self.stackedWidget.setCurrentWidget(self.findChild(QWidget, k)))
 
-        self.teedata_build_id = HTMLoader("https://teedata.net/")
-        self.teedata_build_id.finished.connect(self.__teedata_build_id_finished)
+    def resource_lists(self):
+        return self.stackedWidget.findChildren(ResourceList)
 
     def showEvent(self, event):
         super().showEvent(event)
-        self.teedata_build_id.start()
-
-
-    def __teedata_build_id_finished(self, data):
-        match = re.search(r'"buildId":"(.*?)"', data)
+        if self.loaded:
+            return
 
-        if match:
-            GlobalsVal.teedata_build_id = match.group(1)
-            self.__teedata_load_data()
+        # 先从本地镜像打开，再在后台与网站同步
+        self.loaded = True
+        self.__teedata_load_data()
+        self.sync_catalogue()
 
     def __teedata_load_data(self):
-        self.TeedataSkinsInterface.data_ready.emit()
-        self.TeedataGameSkinsInterface.data_ready.emit()
-        self.TeedataEmoticonsInterface.data_ready.emit()
-        self.TeedataCursorsInterface.data_ready.emit()
-        self.TeedataParticlesInterface.data_ready.emit()
-        self.TeedataEntitiesInterface.data_ready.emit()
+        for i in self.resource_lists():
+            i.data_ready.emit()
+
+    def __search(self):
+        self.search_timer.stop()
+        query = self.search_edit.text()
+        for i in self.resource_lists():
+            i.search(query)
+
+    def sync_catalogue(self):
+        if self.catalogue_sync is not None:
+            return False
+
+        for i in self.resource_lists():
+            i.begin_sync()
+
+        self.catalogue_sync = CatalogueSync(parent=self)
+        self.catalogue_sync.chunk.connect(self.__on_catalogue_chunk)
+        self.catalogue_sync.synced.connect(self.__on_catalogue_synced)
+        self.catalogue_sync.finished.connect(self.__on_catalogue_sync_finished)
+        self.catalogue_sync.start()
+        return True
+
+    def __find_list(self, list_type):
+        for i in self.resource_lists():
+            if i.list_type == list_type:
+                return i
+
+    def __on_catalogue_chunk(self, list_type, items):
+        self.__find_list(list_type).on_catalogue_chunk(items)
+
+    def __on_catalogue_synced(self, list_type, changed):
+        self.__find_list(list_type).on_catalogue_synced(changed)
+
+    def __on_catalogue_sync_finished(self, success):
+        self.catalogue_sync.wait()
+        self.catalogue_sync.deleteLater()
+        self.catalogue_sync = None
+
+        if not success:
+            InfoBar.warning(
+                title='警告',
+                content="无法从 teedata.net 更新材质目录，当前显示的是本地缓存的数据",
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=3000,
+                parent=GlobalsVal.main_window
+            )
 
     def addSubInterface(self, widget: QLabel, objectName, text):
         widget.setObjectName(objectName)
@@ -279,9 +484,12 @@ class ResourceDownloadInterface(QWidget):
         if text == "下载":
             pass
         elif text == "刷新":
+            if not self.sync_catalogue():
+                return
+
             InfoBar.success(
                 title='成功',
-                content="已重新加载本地资源",
+                content="正在后台更新材质目录",
                 orient=Qt.Horizontal,
                 isClosable=True,
                 position=InfoBarPosition.BOTTOM_RIGHT,
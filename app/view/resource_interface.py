@@ -2,28 +2,26 @@ import os
 import shutil
 from functools import partial
 
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
-from PyQt5.QtGui import QFontMetrics, QPainter, QBrush, QPainterPath
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QStackedWidget, QLabel, QFileDialog, QHBoxLayout
-from qfluentwidgets import CommandBar, Action, FluentIcon, InfoBar, InfoBarPosition, Pivot, TitleLabel, CardWidget, \
-    ImageLabel, CaptionLabel, FlowLayout, SingleDirectionScrollArea, MessageBoxBase, SubtitleLabel, MessageBox, \
-    TogglePushButton, ToolTipFilter, ToolTipPosition, setFont
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QAbstractListModel, QModelIndex, QSize, QRect, QElapsedTimer, \
+    QFileSystemWatcher, QSortFilterProxyModel, QPoint
+from PyQt5.QtGui import QFontMetrics, QPainter, QColor
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QStackedWidget, QLabel, QFileDialog, QHBoxLayout, QListView, \
+    QStyledItemDelegate, QStyle, QAbstractItemView, QFrame, QApplication, QTreeWidgetItem
+from qfluentwidgets import CommandBar, Action, FluentIcon, InfoBar, InfoBarPosition, Pivot, TitleLabel, \
+    MessageBoxBase, SubtitleLabel, MessageBox, SmoothScrollDelegate, isDarkTheme, getFont, setFont, BodyLabel, \
+    TreeWidget, RoundMenu, PushButton, ColorDialog, SearchLineEdit, StateToolTip
 
 from app.config import cfg, config_path
 from app.globals import GlobalsVal
-from app.utils import is_image
-from app.utils.draw_tee import draw_tee
-# from app.utils.image_alpha_check import has_alpha_channel
-
-select_list = {
-    "skins": {},
-    "game": {},
-    "emoticons": {},
-    "cursor": {},
-    "particles": {},
-    "entities": {}
-}
-button_select = None
+from app.utils.asset_importer import AssetImporter
+from app.utils.content_index import DuplicateFinder, content_index
+from app.utils.image_cache import image_cache
+from app.utils.name_index import NameIndex
+from app.utils.palette_index import PaletteFinder
+from app.utils.resource_scanner import ResourceScanner
+from app.utils.similarity_index import SimilarFinder
+from app.utils.thumbnail_loader import ThumbnailLoader
+from app.utils.trash import TrashMover, TrashRestorer, TrashPurger, trash
 
 
 class FileSelectMessageBox(MessageBoxBase):
@@ -73,108 +71,344 @@ class FileSelectMessageBox(MessageBoxBase):
         return self.selected_files
 
 
-class ResourceCard(CardWidget):
-    selected = False
+class DuplicateMessageBox(MessageBoxBase):
+    """按组列出内容相同的文件，每组默认保留一个，其余勾选的文件将被移到回收区"""
 
-    def __init__(self, file, card_type, parent=None):
+    def __init__(self, groups, directories, parent=None):
         super().__init__(parent)
-        global button_select
+        self.titleLabel = SubtitleLabel(self.tr('重复文件'))
+        self.label = BodyLabel(self.tr("找到 {} 组内容完全相同的文件，勾选的文件将被移到回收区，删除后可以撤销").format(len(groups)), self)
+        self.yesButton.setText(self.tr("删除选中"))
+        self.cancelButton.setText(self.tr("取消"))
 
-        self.card_type = card_type
-        self.file = file
-        self.setFixedSize(135, 120)
+        self.tree = TreeWidget(self)
+        self.tree.setHeaderHidden(True)
+        self.tree.setMinimumSize(560, 360)
+
+        def keep_order(file):
+            # 优先保留靠前目录(如 skins)中名称较短的文件
+            directory = os.path.dirname(file)
+            return directories.index(directory) if directory in directories else len(directories), \
+                len(os.path.basename(file)), file
+
+        for group in groups:
+            group = sorted(group, key=keep_order)
+            parent_item = QTreeWidgetItem([self.tr("{} 等 {} 个文件").format(os.path.basename(group[0]), len(group))])
+            for index, file in enumerate(group):
+                item = QTreeWidgetItem([file])
+                item.setData(0, Qt.UserRole, file)
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(0, Qt.Unchecked if index == 0 else Qt.Checked)
+                parent_item.addChild(item)
+            self.tree.addTopLevelItem(parent_item)
+        self.tree.expandAll()
 
-        if self.card_type == "skins":
-            self.iconWidget = ImageLabel(draw_tee(self.file), self)
-            self.iconWidget.scaledToHeight(110)
-        else:
-            self.iconWidget = ImageLabel(self.file, self)
-            if self.card_type == "entities":
-                self.iconWidget.scaledToHeight(100)
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(self.label)
+        self.viewLayout.addWidget(self.tree)
+
+    def get_checked_files(self):
+        files = []
+        for i in range(self.tree.topLevelItemCount()):
+            parent_item = self.tree.topLevelItem(i)
+            for j in range(parent_item.childCount()):
+                item = parent_item.child(j)
+                if item.checkState(0) == Qt.Checked:
+                    files.append(item.data(0, Qt.UserRole))
+        return files
+
+
+class ResourceModel(QAbstractListModel):
+    """
+    材质列表的数据模型，选中状态保存在模型中
+    缩略图在视图需要绘制时才向 ThumbnailLoader 请求，解码后的图像保存在共用的 image_cache 中
+    """
+    FileRole = Qt.UserRole + 1
+    SelectedRole = Qt.UserRole + 2
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 列表第一次显示时才创建
+        self.loader = None
+        # 缓存中的图像只按路径区分，模型销毁后需释放，避免其他列表命中已不属于任何模型的图像
+        self.destroyed.connect(lambda: image_cache.release(self))
+
+        self.files = []
+        self.rows = {}
+        self.stats = {}
+        self.selected = set()
+        self.names = NameIndex()
+
+    def set_loader(self, loader):
+        self.loader = loader
+        self.loader.loaded.connect(self.set_image)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        file = self.files[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return os.path.basename(file)[:-4]
+        elif role == Qt.DecorationRole:
+            image = image_cache.get(file)
+            if image is None:
+                self.loader.request(file, self.stats.get(file))
+            return image
+        elif role == self.FileRole:
+            return file
+        elif role == self.SelectedRole:
+            return file in self.selected
+        return None
+
+    def set_files(self, entries):
+        """entries 为 (路径, stat) 列表"""
+        self.beginResetModel()
+        self.files = [file for file, _ in entries]
+        self.rows = {file: row for row, file in enumerate(self.files)}
+        self.stats = dict(entries)
+        image_cache.release(self)
+        self.selected = set()
+        self.names.clear()
+        for file in self.files:
+            self.names.add(file)
+        self.loader.clear()
+        self.endResetModel()
+
+    def append_files(self, entries):
+        if not entries:
+            return
+
+        row = len(self.files)
+        self.beginInsertRows(QModelIndex(), row, row + len(entries) - 1)
+        for file, stat in entries:
+            self.rows[file] = len(self.files)
+            self.files.append(file)
+            self.stats[file] = stat
+            self.names.add(file)
+        self.endInsertRows()
+
+    def remove_files(self, files):
+        rows = sorted((self.rows[i] for i in files if i in self.rows), reverse=True)
+        if not rows:
+            return
+
+        # 合并连续的行，从后往前删除
+        ranges = []
+        for row in rows:
+            if ranges and ranges[-1][0] == row + 1:
+                ranges[-1][0] = row
             else:
-                self.iconWidget.scaledToHeight(60)
+                ranges.append([row, row])
+
+        for first, last in ranges:
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for file in self.files[first:last + 1]:
+                self.stats.pop(file, None)
+                image_cache.remove(file)
+                self.selected.discard(file)
+                self.names.remove(file)
+            del self.files[first:last + 1]
+            self.endRemoveRows()
+
+        self.rows = {file: row for row, file in enumerate(self.files)}
+
+    def update_files(self, entries):
+        """文件内容变化后更新 stat 并丢弃旧缩略图，下次绘制时重新加载"""
+        for file, stat in entries:
+            self.stats[file] = stat
+            image_cache.remove(file)
+            row = self.rows.get(file)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def set_image(self, file, image):
+        row = self.rows.get(file)
+        if row is None:
+            return
 
-        self.label = CaptionLabel(self)
-        self.label.setText(self.get_elided_text(self.label, os.path.basename(self.file)[:-4]))
-        self.label.setToolTip(os.path.basename(self.file)[:-4])
-        self.label.setToolTipDuration(1000)
-        self.label.installEventFilter(ToolTipFilter(self.label, showDelay=300, position=ToolTipPosition.BOTTOM))
+        image_cache.put(self, file, image)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
 
-        self.vBoxLayout = QVBoxLayout(self)
-        self.vBoxLayout.addWidget(self.iconWidget, 0, Qt.AlignCenter)
+    def release_images(self, keep=()):
+        """释放 keep 以外已解码的缩略图，再次绘制时重新加载"""
+        image_cache.release(self, keep)
 
-        if self.card_type == "cursor":
-            self.button = TogglePushButton(self.tr("启用"), self)
-            self.button.clicked.connect(self.__button_clicked)
-            self.vBoxLayout.addWidget(self.button, 0, Qt.AlignCenter)
+    def toggle_selected(self, row):
+        file = self.files[row]
+        if file in self.selected:
+            self.selected.remove(file)
+        else:
+            self.selected.add(file)
 
-            self.select_cursor = cfg.get(cfg.DDNetAssetsCursor)
-            if self.select_cursor is not None:
-                if file == self.select_cursor:
-                    self.button.setText(self.tr('禁用'))
-                    button_select = self.button
-                    button_select.setChecked(True)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [self.SelectedRole])
 
-        self.vBoxLayout.addWidget(self.label, 0, Qt.AlignCenter)
+    def selected_files(self):
+        return [i for i in self.files if i in self.selected]
 
-        self.clicked.connect(self.__on_clicked)
+    def clear_selection(self):
+        self.selected = set()
+        if self.files:
+            self.dataChanged.emit(self.index(0), self.index(len(self.files) - 1), [self.SelectedRole])
 
-    def __button_clicked(self, checked):  # gui_cursor.png
-        global button_select
-        if button_select is not None and button_select != self.button:
-            button_select.setChecked(False)
-            button_select.setText(self.tr('启用'))
 
-        ddnet_folder = GlobalsVal.ddnet_folder
+class ResourceFilterModel(QSortFilterProxyModel):
+    """
+    按名称组合多个过滤条件，每个条件为 文件 → bool 的函数
+    设置排序键时按键值排序，否则保持源模型的顺序
+    """
 
-        if checked:
-            self.button.setText(self.tr('禁用'))
-            button_select = self.button
-            cfg.set(cfg.DDNetAssetsCursor, self.file)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filters = {}
+        self.sort_key = None
 
-            shutil.copy(self.file, f"{ddnet_folder}/gui_cursor.png")
+    def set_filter(self, name, accept=None):
+        if accept is None:
+            self.filters.pop(name, None)
         else:
-            self.button.setText(self.tr('启用'))
-            cfg.set(cfg.DDNetAssetsCursor, f"{ddnet_folder}/gui_cursor.png")
-            os.remove(f"{ddnet_folder}/gui_cursor.png")
-
-    def __on_clicked(self):
-        self.set_selected(not self.selected)
+            self.filters[name] = accept
+        self.invalidateFilter()
 
-    def set_selected(self, selected):
-        self.selected = selected
-        if self.selected:
-            select_list[self.card_type][self.file] = self
+    def set_sort_key(self, key=None):
+        self.sort_key = key
+        if key is None:
+            self.sort(-1)
         else:
-            del select_list[self.card_type][self.file]
-        self.update()
+            self.invalidate()
+            self.sort(0)
+
+    def setSourceModel(self, model):
+        # 过滤时逐行调用，直接持有源模型避免每次经过 sourceModel() 包装
+        self.source = model
+        super().setSourceModel(model)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.filters:
+            return True
+
+        file = self.source.files[source_row]
+        for accept in self.filters.values():
+            if not accept(file):
+                return False
+        return True
+
+    def lessThan(self, left, right):
+        if self.sort_key is None:
+            return left.row() < right.row()
+
+        files = self.source.files
+        return self.sort_key(files[left.row()]) < self.sort_key(files[right.row()])
+
+
+class ResourceDelegate(QStyledItemDelegate):
+    """按卡片样式绘制材质：圆角背景、缩略图、名称，光标页额外绘制启用按钮"""
+    card_size = QSize(135, 120)
+    margin = 5
+
+    def __init__(self, list_type, image_height, parent=None):
+        super().__init__(parent)
+        self.list_type = list_type
+        self.image_height = image_height
+        self.font = getFont(12)
+
+    def sizeHint(self, option, index):
+        return self.card_size + QSize(self.margin * 2, self.margin * 2)
+
+    def card_rect(self, rect):
+        return rect.adjusted(self.margin, self.margin, -self.margin, -self.margin)
+
+    def label_rect(self, rect):
+        card = self.card_rect(rect)
+        return QRect(card.left() + 6, card.bottom() - 22, card.width() - 12, 16)
+
+    def button_rect(self, rect):
+        card = self.card_rect(rect)
+        return QRect(card.center().x() - 40, self.label_rect(rect).top() - 34, 80, 30)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+
+        dark = isDarkTheme()
+        card = self.card_rect(option.rect)
+        hover = bool(option.state & QStyle.State_MouseOver)
 
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        if self.selected:
-            painter = QPainter(self)
-            painter.setRenderHint(QPainter.Antialiasing)
+        if index.data(ResourceModel.SelectedRole):
+            painter.setBrush(cfg.get(cfg.themeColor))
+        else:
+            painter.setBrush(QColor(255, 255, 255, (21 if hover else 13) if dark else (255 if hover else 170)))
+        painter.setPen(QColor(255, 255, 255, 14) if dark else QColor(0, 0, 0, 19))
+        painter.drawRoundedRect(card, 5, 5)
 
-            rect = self.rect()
-            path = QPainterPath()
-            path.addRoundedRect(rect.x(), rect.y(), rect.width(), rect.height(), 5, 5)
+        label = self.label_rect(option.rect)
+        if self.list_type == "skins":
+            # TEE 位于缩略图的上半部分，名称可以覆盖在下方空白处
+            bottom = card.bottom() - self.margin
+        elif self.list_type == "cursor":
+            bottom = self.button_rect(option.rect).top() - 2
+        else:
+            bottom = label.top() - 2
+
+        image = index.data(Qt.DecorationRole)
+        if image is not None and not image.isNull():
+            height = min(self.image_height, bottom - card.top() - self.margin)
+            width = min(card.width() - self.margin * 2, round(image.width() * height / image.height()))
+            height = min(height, round(image.height() * width / image.width()))
+            target = QRect(0, 0, width, height)
+            target.moveCenter(card.center())
+            target.moveTop(card.top() + self.margin)
+            painter.drawImage(target, image)
+
+        text_color = QColor(255, 255, 255) if dark else QColor(0, 0, 0)
+        painter.setFont(self.font)
+
+        if self.list_type == "cursor":
+            button = self.button_rect(option.rect)
+            checked = index.data(ResourceModel.FileRole) == cfg.get(cfg.DDNetAssetsCursor)
+            if checked:
+                painter.setBrush(cfg.get(cfg.themeColor))
+                painter.setPen(Qt.NoPen)
+            else:
+                painter.setBrush(QColor(255, 255, 255, 15) if dark else QColor(255, 255, 255, 179))
+                painter.setPen(QColor(255, 255, 255, 20) if dark else QColor(0, 0, 0, 25))
+            painter.drawRoundedRect(button, 5, 5)
 
-            painter.setBrush(QBrush(cfg.get(cfg.themeColor)))
-            painter.setPen(Qt.NoPen)
-            painter.drawPath(path)
+            painter.setPen(QColor(0, 0, 0) if checked and dark else QColor(255, 255, 255) if checked else text_color)
+            painter.drawText(button, Qt.AlignCenter, self.tr('禁用') if checked else self.tr('启用'))
 
-    def get_elided_text(self, label, text):
-        # 省略文本
-        metrics = QFontMetrics(label.font())
-        available_width = label.width()
+        painter.setPen(text_color)
+        name = QFontMetrics(self.font).elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, label.width())
+        painter.drawText(label, Qt.AlignCenter, name)
 
-        elided_text = metrics.elidedText(text, Qt.ElideRight, available_width)
-        return elided_text
+        painter.restore()
 
 
-class ResourceList(SingleDirectionScrollArea):
+class ResourceList(QListView):
+    """
+    材质网格，只绘制可见区域内的条目
+    目录由 ResourceScanner 在后台扫描，结果按时间片分批插入模型
+    目录变化时只重新扫描变化的目录，并把新增、删除、修改的文件增量更新到模型
+    第一次显示时才开始扫描，隐藏时暂停加载，隐藏一段时间后释放已解码的缩略图
+    缩略图由 ThumbnailLoader 按需加载，选中状态保存在 ResourceModel 中
+    """
     refresh_resource = pyqtSignal()
-    file_list = []
+
+    # 每次向模型插入条目的时间预算(毫秒)与单次插入的条目数
+    populate_budget = 8
+    populate_chunk = 512
+    # 目录变化通知的合并间隔(毫秒)，游戏写入文件时会连续触发多次
+    watch_delay = 500
+    # 隐藏后释放缩略图的等待时间(毫秒)
+    release_delay = 60000
+    # 滚动停止后释放远离可见区域的缩略图的等待时间(毫秒)，上下各保留一屏
+    offscreen_delay = 1000
 
     def __init__(self, list_type, parent=None):
         super().__init__(parent)
@@ -190,59 +424,449 @@ class ResourceList(SingleDirectionScrollArea):
         else:
             self.file_path = [f"{GlobalsVal.ddnet_folder}/assets/{self.list_type}"]
 
-        self.containerWidget = QWidget()
-        self.containerWidget.setStyleSheet("background: transparent;")
-        self.fBoxLayout = FlowLayout(self.containerWidget)
-        self.setContentsMargins(11, 11, 11, 11)
+        if self.list_type == "skins":
+            image_height = 110
+        elif self.list_type == "entities":
+            image_height = 100
+        else:
+            image_height = 60
+        self.image_height = image_height
+
+        # 图集与渲染进程池在第一次显示时才创建，未打开过的页只是轻量的占位
+        self.loader = None
+        self.resource_model = ResourceModel(self)
+        self.resource_delegate = ResourceDelegate(self.list_type, image_height, self)
+        self.filter_model = ResourceFilterModel(self)
+        self.filter_model.setSourceModel(self.resource_model)
+        self.setModel(self.filter_model)
+        self.setItemDelegate(self.resource_delegate)
+
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(256)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setFrameShape(QFrame.NoFrame)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover)
+        self.setViewportMargins(6, 6, 6, 6)
+        self.setStyleSheet("QListView { background: transparent; border: none; }")
+
+        self.scrollDelegate = SmoothScrollDelegate(self)
+
+        self.file_list = []
+        self.invalid_files = {}
+        self.pending_entries = []
+        self.scanner = None
+        self.scanning = False
+
+        self.populate_timer = QTimer(self)
+        self.populate_timer.setSingleShot(True)
+        self.populate_timer.setInterval(0)
+        self.populate_timer.timeout.connect(self.__populate)
+
+        self.changed_dirs = set()
+        self.sync_entries = []
+        self.watch_suspended = False
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.__on_directory_changed)
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(self.watch_delay)
+        self.watch_timer.timeout.connect(self.__sync_changed)
+
+        self.release_timer = QTimer(self)
+        self.release_timer.setSingleShot(True)
+        self.release_timer.setInterval(self.release_delay)
+        self.release_timer.timeout.connect(self.resource_model.release_images)
+
+        self.offscreen_timer = QTimer(self)
+        self.offscreen_timer.setSingleShot(True)
+        self.offscreen_timer.setInterval(self.offscreen_delay)
+        self.offscreen_timer.timeout.connect(self.release_offscreen)
+        self.verticalScrollBar().valueChanged.connect(lambda: self.offscreen_timer.start())
+
+        self.similar_finder = None
+        self.palette_finder = None
+        self.loaded = False
+        self.refresh_resource.connect(self.reload)
+        QApplication.instance().aboutToQuit.connect(self.stop_scanner)
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self.release_timer.stop()
+        if not self.loaded:
+            self.load()
+            return
 
-        self.setWidgetResizable(True)
-        self.enableTransparentBackground()
-        self.setWidget(self.containerWidget)
+        self.loader.resume()
+        if self.pending_entries:
+            self.populate_timer.start()
+
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        if self.loader is not None:
+            self.loader.pause()
+        self.populate_timer.stop()
+        self.offscreen_timer.stop()
+        self.release_timer.start()
+
+    def visible_rows(self):
+        """返回可见区域内第一个与最后一个条目在模型中的行号，没有条目时返回 None"""
+        viewport = self.viewport().rect()
+        first = self.indexAt(viewport.topLeft() + QPoint(1, 1))
+        if not first.isValid():
+            return None
+
+        last = self.indexAt(QPoint(1, viewport.bottom() - 1))
+        # 最后一行的第一个条目之后还有同一行的其他条目
+        per_row = max(1, viewport.width() // self.resource_delegate.sizeHint(None, first).width())
+        last = last.row() + per_row - 1 if last.isValid() else self.filter_model.rowCount() - 1
+        return first.row(), min(last, self.filter_model.rowCount() - 1)
+
+    def release_offscreen(self):
+        rows = self.visible_rows()
+        if rows is None:
+            return
 
-        for i in self.file_path:
-            if os.path.exists(i):
-                self.file_list = self.file_list + [os.path.join(i, file_name) for file_name in os.listdir(i)]
+        first, last = rows
+        span = last - first + 1
+        keep = set()
+        for row in range(max(0, first - span), min(self.filter_model.rowCount(), last + span + 1)):
+            source_row = self.filter_model.mapToSource(self.filter_model.index(row, 0)).row()
+            keep.add(self.resource_model.files[source_row])
+        self.resource_model.release_images(keep)
 
-        self.batch_size = 1
-        self.current_index = 0
+    def is_loading(self):
+        return self.scanning or bool(self.pending_entries)
 
-        QTimer.singleShot(0, self.load_next_batch)
+    def stop_scanner(self):
+        if self.scanner is None:
+            return
 
-        self.refresh_resource.connect(self.__refresh)
+        self.scanner.chunk.disconnect()
+        self.scanner.finished.disconnect()
+        self.scanner.stop()
+        self.scanner.deleteLater()
+        self.scanner = None
+
+    def __on_scan_chunk(self, entries):
+        self.pending_entries.extend(entries)
+        if self.isVisible() and not self.populate_timer.isActive():
+            self.populate_timer.start()
+
+    def __on_scan_finished(self, invalid_files):
+        self.invalid_files = invalid_files
+        self.scanning = False
+        if not self.pending_entries:
+            self.on_load_finished()
+
+    def __populate(self):
+        elapsed = QElapsedTimer()
+        elapsed.start()
+
+        index = 0
+        while index < len(self.pending_entries) and elapsed.elapsed() < self.populate_budget:
+            entries = self.pending_entries[index:index + self.populate_chunk]
+            self.resource_model.append_files(entries)
+            self.file_list.extend(file for file, _ in entries)
+            index += len(entries)
+        del self.pending_entries[:index]
+
+        if self.pending_entries:
+            self.populate_timer.start()
+        elif not self.scanning:
+            self.on_load_finished()
+
+    def on_load_finished(self):
+        # 清理图集中已删除的文件
+        self.loader.retain(self.file_list)
+        self.watch_directories()
+        if self.changed_dirs:
+            self.watch_timer.start()
+
+        if self.invalid_files:
+            # 等待主窗口创建完成后再提示
+            QTimer.singleShot(0, self.show_invalid_files)
+
+    def show_invalid_files(self):
+        details = "\n".join(f"{os.path.basename(file)}：{reason}" for file, reason in list(self.invalid_files.items())[:5])
+        InfoBar.warning(
+            title=self.tr('警告'),
+            content=self.tr("{} 个文件不符合DDNet材质规格，已跳过\n{}").format(len(self.invalid_files), details),
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=5000,
+            parent=GlobalsVal.main_window
+        )
+
+    def selected_files(self):
+        return self.resource_model.selected_files()
+
+    def remove_entries(self, files):
+        """文件已从磁盘移走后直接从模型中删除，不等待重新扫描"""
+        model = self.resource_model
+        for file in files:
+            stat = model.stats.get(file)
+            if stat is not None:
+                self.loader.forget(file, stat)
+            self.invalid_files.pop(file, None)
+        model.remove_files(files)
+        self.file_list = list(model.files)
+
+    def mouseReleaseEvent(self, e):
+        super().mouseReleaseEvent(e)
+        if e.button() != Qt.LeftButton:
+            return
 
-    def load_next_batch(self):
-        end_index = min(self.current_index + self.batch_size, len(self.file_list))
-        for i in range(self.current_index, end_index):
-            resource_path = self.file_list[i]
-            file_extension = os.path.splitext(resource_path)[1].lower()
+        index = self.indexAt(e.pos())
+        if not index.isValid():
+            return
 
-            if not is_image(resource_path) or file_extension != '.png': # 非PNG格式或图片文件不渲染
-                continue
+        rect = self.visualRect(index)
+        if self.list_type == "cursor" and self.resource_delegate.button_rect(rect).contains(e.pos()):
+            self.toggle_cursor(index.data(ResourceModel.FileRole))
+        elif self.resource_delegate.card_rect(rect).contains(e.pos()):
+            self.resource_model.toggle_selected(self.filter_model.mapToSource(index).row())
 
-            # if not is_image(resource_path) or has_alpha_channel(resource_path):
-            #     continue
+    def contextMenuEvent(self, e):
+        index = self.indexAt(self.viewport().mapFromGlobal(e.globalPos()))
 
-            self.fBoxLayout.addWidget(ResourceCard(resource_path, self.list_type))
-        self.current_index = end_index
+        menu = RoundMenu(parent=self)
+        if self.list_type == "skins" and index.isValid():
+            menu.addAction(Action(FluentIcon.SEARCH, self.tr("查找相似"),
+                                  triggered=partial(self.find_similar, index.data(ResourceModel.FileRole))))
+        if "similar" in self.filter_model.filters or "color" in self.filter_model.filters:
+            menu.addAction(Action(FluentIcon.CLOSE, self.tr("显示全部"), triggered=self.clear_ranked_filters))
 
-        if self.current_index < len(self.file_list):
-            QTimer.singleShot(0, self.load_next_batch)
+        if menu.actions():
+            menu.exec(e.globalPos())
 
-    def __refresh(self):
-        for i in reversed(range(self.fBoxLayout.count())):
-            widget = self.fBoxLayout.itemAt(i).widget()
-            if widget:
-                self.fBoxLayout.removeWidget(widget)
-                widget.deleteLater()
+    def find_similar(self, file):
+        if self.similar_finder is not None:
+            return
 
-        self.file_list = []
+        self.similar_finder = SimilarFinder(file, dict(self.resource_model.stats), self)
+        self.similar_finder.finished.connect(self.__on_similar_found)
+        self.similar_finder.start()
+
+        InfoBar.info(
+            title=self.tr('提示'),
+            content=self.tr("正在查找与 {} 相似的皮肤").format(os.path.basename(file)[:-4]),
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=2000,
+            parent=GlobalsVal.main_window
+        )
+
+    def __on_similar_found(self, file, results):
+        self.similar_finder.wait()
+        self.similar_finder.deleteLater()
+        self.similar_finder = None
+
+        if len(results) <= 1:
+            InfoBar.warning(
+                title=self.tr('警告'),
+                content=self.tr("没有找到与 {} 相似的皮肤").format(os.path.basename(file)[:-4]),
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=2000,
+                parent=GlobalsVal.main_window
+            )
+            return
+
+        # 按汉明距离排序，距离相同时按路径
+        self.apply_ranked_filter("similar", [(distance, path) for distance, path in results],
+                                 self.tr("找到 {} 个与 {} 相似的皮肤").format(len(results) - 1, os.path.basename(file)[:-4]))
+
+    def find_color(self, color):
+        if self.palette_finder is not None or self.loader is None:
+            return
+
+        self.palette_finder = PaletteFinder(dict(self.resource_model.stats), color.getRgb()[:3], self.loader.renderer, self)
+        self.palette_finder.finished.connect(partial(self.__on_color_found, color))
+        self.palette_finder.start()
+
+    def __on_color_found(self, color, results):
+        self.palette_finder.wait()
+        self.palette_finder.deleteLater()
+        self.palette_finder = None
+
+        if not results:
+            InfoBar.warning(
+                title=self.tr('警告'),
+                content=self.tr("没有找到颜色接近 {} 的皮肤").format(color.name()),
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=2000,
+                parent=GlobalsVal.main_window
+            )
+            return
+
+        # 按接近目标颜色的像素占比从高到低排序
+        self.apply_ranked_filter("color", [(-score, path) for score, path in results],
+                                 self.tr("找到 {} 个颜色接近 {} 的皮肤").format(len(results), color.name()))
+
+    def apply_ranked_filter(self, name, ranked, content):
+        """只显示 ranked 中的文件，并按 (排序键, 文件) 排序"""
+        order = {path: (key, path) for key, path in ranked}
+        self.filter_model.set_filter(name, order.__contains__)
+        self.filter_model.set_sort_key(order.get)
+        self.scrollToTop()
+
+        info = InfoBar.success(
+            title=self.tr('成功'),
+            content=content,
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=-1,
+            parent=GlobalsVal.main_window
+        )
+        button = PushButton(self.tr("显示全部"))
+        button.clicked.connect(self.clear_ranked_filters)
+        button.clicked.connect(info.close)
+        info.addWidget(button)
+
+    def search(self, query):
+        """按名称过滤，之后扫描到的匹配文件会自动显示"""
+        names = self.resource_model.names
+        names.set_query(query.strip())
+        self.filter_model.set_filter("name", names.accepts if names.query else None)
+
+    def clear_ranked_filters(self):
+        # 先恢复原有顺序，再移除过滤条件
+        self.filter_model.set_sort_key()
+        self.filter_model.set_filter("similar")
+        self.filter_model.set_filter("color")
+
+    def toggle_cursor(self, file):  # gui_cursor.png
+        ddnet_folder = GlobalsVal.ddnet_folder
+
+        if cfg.get(cfg.DDNetAssetsCursor) != file:
+            cfg.set(cfg.DDNetAssetsCursor, file)
+            shutil.copy(file, f"{ddnet_folder}/gui_cursor.png")
+        else:
+            cfg.set(cfg.DDNetAssetsCursor, f"{ddnet_folder}/gui_cursor.png")
+            os.remove(f"{ddnet_folder}/gui_cursor.png")
+
+        self.viewport().update()
+
+    def watch_directories(self):
+        # 目录可能在游戏运行后才创建，每次同步后补充监视
+        watched = self.watcher.directories()
+        for i in self.file_path:
+            if os.path.isdir(i) and i not in watched:
+                self.watcher.addPath(i)
+
+    def __on_directory_changed(self, path):
+        path = os.path.normpath(path)
         for i in self.file_path:
-            if os.path.exists(i):
-                self.file_list = self.file_list + [os.path.join(i, file_name) for file_name in os.listdir(i)]
+            if os.path.normpath(i) == path:
+                self.changed_dirs.add(i)
+        self.watch_timer.start()
 
-        self.current_index = 0
+    def __sync_changed(self):
+        if self.watch_suspended:
+            return
+        directories, self.changed_dirs = list(self.changed_dirs), set()
+        self.sync(directories)
+
+    def suspend_watch(self):
+        """批量写入期间只记录变化的目录，不触发同步"""
+        self.watch_suspended = True
+        self.watch_timer.stop()
+
+    def resume_watch(self, directories=()):
+        """恢复监视，并对期间变化的目录做一次增量同步"""
+        self.watch_suspended = False
+        self.changed_dirs.update(directories)
+        if self.changed_dirs:
+            self.__sync_changed()
+
+    def load(self):
+        """第一次显示时创建缩略图加载器并完整扫描"""
+        self.loaded = True
+        self.loader = ThumbnailLoader(self.list_type, self.file_path, self.image_height, self)
+        self.resource_model.set_loader(self.loader)
+        self.__refresh()
+
+    def reload(self):
+        """刷新：尚未显示过的列表直接完整扫描，否则增量同步"""
+        if not self.loaded:
+            self.load()
+        else:
+            self.sync(self.file_path)
+
+    def sync(self, directories):
+        """重新扫描指定目录，与模型中的文件比较后只更新变化的部分"""
+        if not self.loaded:
+            # 尚未显示过，第一次显示时会完整扫描
+            return
+
+        if self.is_loading():
+            # 正在扫描时推迟到扫描结束后
+            self.changed_dirs.update(directories)
+            return
+
+        self.sync_entries = []
+        self.__start_scan(directories, self.sync_entries.extend, partial(self.__on_sync_finished, directories))
+
+    def __on_sync_finished(self, directories, invalid_files):
+        self.scanning = False
+        directories = set(directories)
+        new = dict(self.sync_entries)
+        self.sync_entries = []
+
+        model = self.resource_model
+        old = {file: stat for file, stat in model.stats.items() if os.path.dirname(file) in directories}
+        removed = [file for file in old if file not in new]
+        added = [(file, stat) for file, stat in new.items() if file not in old]
+        modified = [(file, stat) for file, stat in new.items() if file in old and
+                    (stat.st_mtime_ns, stat.st_size) != (old[file].st_mtime_ns, old[file].st_size)]
+
+        for file in removed:
+            self.loader.forget(file, old[file])
+        for file, _ in modified:
+            self.loader.forget(file, old[file])
+
+        model.remove_files(removed)
+        model.update_files(modified)
+        model.append_files(added)
+        self.file_list = list(model.files)
+
+        self.invalid_files = {file: reason for file, reason in self.invalid_files.items()
+                              if os.path.dirname(file) not in directories}
+        self.invalid_files.update(invalid_files)
+
+        self.watch_directories()
+        if self.changed_dirs:
+            self.watch_timer.start()
+
+    def __start_scan(self, directories, on_chunk, on_finished):
+        self.stop_scanner()
+        self.scanning = True
+        self.scanner = ResourceScanner(directories, self.list_type, self)
+        self.scanner.chunk.connect(on_chunk)
+        self.scanner.finished.connect(on_finished)
+        self.scanner.start()
 
-        QTimer.singleShot(0, self.load_next_batch)
+    def __refresh(self):
+        self.populate_timer.stop()
+
+        self.file_list = []
+        self.invalid_files = {}
+        self.pending_entries = []
+        self.resource_model.set_files([])
+
+        self.__start_scan(self.file_path, self.__on_scan_chunk, self.__on_scan_finished)
 
 
 class ResourceInterface(QWidget):
@@ -267,9 +891,35 @@ class ResourceInterface(QWidget):
         self.commandBar = CommandBar(self)
         self.commandBar.setToolButtonStyle(Qt.ToolButtonTextBesideIcon)
 
+        self.searchEdit = SearchLineEdit(self)
+        self.searchEdit.setPlaceholderText(self.tr('搜索资源'))
+        self.searchEdit.setFixedWidth(240)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(100)
+        self.search_timer.timeout.connect(self.__search)
+        self.searchEdit.textChanged.connect(self.search_timer.start)
+        self.searchEdit.searchSignal.connect(self.__search)
+        self.searchEdit.clearSignal.connect(self.__search)
+
+        self.toolLayout = QHBoxLayout()
+        self.toolLayout.addWidget(self.commandBar, 1)
+        self.toolLayout.addWidget(self.searchEdit)
+
         self.addButton(FluentIcon.ADD, self.tr('添加'), '添加'),
         self.addButton(FluentIcon.DELETE, self.tr('删除'), '删除'),
         self.addButton(FluentIcon.SYNC, self.tr('刷新'), '刷新'),
+        self.addButton(FluentIcon.COPY, self.tr('查重'), '查重'),
+        self.addButton(FluentIcon.PALETTE, self.tr('颜色'), '颜色'),
+
+        self.duplicate_finder = None
+        self.asset_importer = None
+        self.stateTooltip = None
+        self.trash_worker = None
+        # 启动时清理一次上次运行留下的超出容量或保存时间的批次
+        self.trash_purger = TrashPurger(self)
+        self.trash_purger.finished.connect(self.trash_purger.deleteLater)
+        self.trash_purger.start()
 
         self.TeedataSkinsInterface = ResourceList('skins', self)
         self.TeedataGameSkinsInterface = ResourceList('game', self)
@@ -286,7 +936,7 @@ class ResourceInterface(QWidget):
         self.addSubInterface(self.TeedataEntitiesInterface, 'TeedataEntitiesInterface', self.tr('实体层'))
 
         self.vBoxLayout.addWidget(self.pivot, 0, Qt.AlignLeft)
-        self.vBoxLayout.addWidget(self.commandBar)
+        self.vBoxLayout.addLayout(self.toolLayout)
         self.vBoxLayout.addWidget(self.stackedWidget)
 
         self.stackedWidget.setCurrentWidget(self.TeedataSkinsInterface)
@@ -294,6 +944,12 @@ class ResourceInterface(QWidget):
         self.pivot.currentItemChanged.connect(
             lambda k: self.stackedWidget.setCurrentWidget(self.findChild(QWidget, k)))
 
+    def __search(self):
+        self.search_timer.stop()
+        query = self.searchEdit.text()
+        for i in self.stackedWidget.findChildren(ResourceList):
+            i.search(query)
+
     def addSubInterface(self, widget: QLabel, objectName, text):
         widget.setObjectName(objectName)
         self.stackedWidget.addWidget(widget)
@@ -305,7 +961,6 @@ class ResourceInterface(QWidget):
         self.commandBar.addAction(action)
 
     def Button_clicked(self, text):
-        global button_select
         current_item = self.pivot.currentItem().text()
 
         if text == "添加":
@@ -323,39 +978,10 @@ class ResourceInterface(QWidget):
                         parent=GlobalsVal.main_window
                     )
                 else:
-                    errors = 0
-                    cover = 0
-                    for i in files:
-                        if i.split("/")[-1] in [file for file in os.listdir(self.get_resource_url(current_item))]:
-                            cover += 1
-
-                        try:
-                            shutil.copy(i, self.get_resource_url(current_item))
-                        except Exception as e:
-                            InfoBar.error(
-                                title=self.tr('错误'),
-                                content=self.tr("文件 {} 复制失败\n原因：{}").format(i, e),
-                                orient=Qt.Horizontal,
-                                isClosable=True,
-                                position=InfoBarPosition.BOTTOM_RIGHT,
-                                duration=-1,
-                                parent=GlobalsVal.main_window
-                            )
-                            errors += 1
-
-                    InfoBar.success(
-                        title='成功',
-                        content=self.tr("文件复制已完成\n共复制了 {} 个文件，{} 个文件被覆盖，{} 个文件失败").format(len(files), cover, errors),
-                        orient=Qt.Horizontal,
-                        isClosable=True,
-                        position=InfoBarPosition.BOTTOM_RIGHT,
-                        duration=2000,
-                        parent=GlobalsVal.main_window
-                    )
-                    self.Button_clicked("刷新")
+                    self.import_files(files, current_item)
 
         elif text == "删除":
-            selected_items = select_list[self.get_resource_pivot_type(current_item)]
+            selected_items = self.get_resource_pivot(current_item).selected_files()
             if not selected_items:
                 InfoBar.warning(
                     title=self.tr('警告'),
@@ -372,34 +998,38 @@ class ResourceInterface(QWidget):
             for i in selected_items:
                 delete_file += f"{i}\n"
 
-            w = MessageBox(self.tr("警告"), self.tr("此操作将会从磁盘中永久删除下列文件，不可恢复：\n{}").format(delete_file), self)
-            delete = 0
+            w = MessageBox(self.tr("警告"), self.tr("下列文件将被移到回收区，删除后可以撤销：\n{}").format(delete_file), self)
             if w.exec():
-                for i in selected_items:
-                    try:
-                        os.remove(i)
-                        delete += 1
-                    except:
-                        pass
+                self.trash_files(self.get_resource_pivot(current_item), selected_items)
 
-                select_list[self.get_resource_pivot_type(current_item)] = {}
+        elif text == "查重":
+            if self.duplicate_finder is not None:
+                return
 
+            resource_list = self.get_resource_pivot(current_item)
+            self.duplicate_finder = DuplicateFinder(dict(resource_list.resource_model.stats), self)
+            self.duplicate_finder.finished.connect(partial(self.__on_duplicates_found, resource_list))
+            self.duplicate_finder.start()
+
+        elif text == "颜色":
+            if self.get_resource_pivot_type(current_item) != "skins":
                 InfoBar.warning(
-                    title=self.tr('成功'),
-                    content=self.tr("共删除 {} 个文件，{} 个文件删除失败").format(delete, len(selected_items) - delete),
+                    title=self.tr('警告'),
+                    content=self.tr("按颜色筛选仅支持皮肤"),
                     orient=Qt.Horizontal,
                     isClosable=True,
                     position=InfoBarPosition.BOTTOM_RIGHT,
                     duration=2000,
                     parent=GlobalsVal.main_window
                 )
+                return
 
-                self.Button_clicked("刷新")
+            w = ColorDialog(cfg.get(cfg.themeColor), self.tr('按颜色筛选'), self.window())
+            w.colorChanged.connect(self.get_resource_pivot(current_item).find_color)
+            w.exec()
 
         elif text == "刷新":
-            button_select = None
             self.get_resource_pivot(current_item).refresh_resource.emit()
-            select_list[self.get_resource_pivot_type(current_item)] = {}
 
             InfoBar.success(
                 title=self.tr('成功'),
@@ -411,6 +1041,170 @@ class ResourceInterface(QWidget):
                 parent=GlobalsVal.main_window
             )
 
+    def import_files(self, files, current_item):
+        if self.asset_importer is not None:
+            InfoBar.warning(
+                title=self.tr('警告'),
+                content=self.tr("上一次导入尚未完成"),
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=2000,
+                parent=GlobalsVal.main_window
+            )
+            return
+
+        resource_list = self.get_resource_pivot(current_item)
+        target_dir = self.get_resource_url(current_item)
+        resource_list.suspend_watch()
+
+        self.stateTooltip = StateToolTip(self.tr('正在导入文件'), self.tr('正在读取文件列表'), self.window())
+        self.stateTooltip.move(self.stateTooltip.getSuitablePos())
+        self.stateTooltip.show()
+
+        self.asset_importer = AssetImporter(files, target_dir, parent=self)
+        self.asset_importer.progress.connect(self.__on_import_progress)
+        self.asset_importer.finished.connect(partial(self.__on_import_finished, resource_list, target_dir))
+        self.asset_importer.start()
+
+    def __on_import_progress(self, done, total):
+        if self.stateTooltip is not None:
+            self.stateTooltip.setContent(self.tr("已导入 {}/{} 个文件").format(done, total))
+
+    def __on_import_finished(self, resource_list, target_dir, result):
+        self.asset_importer.wait()
+        self.asset_importer.deleteLater()
+        self.asset_importer = None
+
+        self.stateTooltip.setContent(self.tr("导入已完成"))
+        self.stateTooltip.setState(True)
+        self.stateTooltip = None
+
+        errors = result["errors"]
+        if errors:
+            content = "\n".join(self.tr("文件 {} 复制失败\n原因：{}").format(name, reason) for name, reason in errors[:3])
+            if len(errors) > 3:
+                content += self.tr("\n以及其他 {} 个文件").format(len(errors) - 3)
+            InfoBar.error(
+                title=self.tr('错误'),
+                content=content,
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=-1,
+                parent=GlobalsVal.main_window
+            )
+
+        InfoBar.success(
+            title='成功',
+            content=self.tr("文件复制已完成\n共复制了 {} 个文件，{} 个文件被覆盖，{} 个文件失败").format(
+                result["copied"], result["covered"], len(errors)),
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=2000,
+            parent=GlobalsVal.main_window
+        )
+        resource_list.resume_watch([target_dir])
+
+    def __on_duplicates_found(self, resource_list, groups):
+        self.duplicate_finder.wait()
+        self.duplicate_finder.deleteLater()
+        self.duplicate_finder = None
+        if not groups:
+            InfoBar.success(
+                title=self.tr('成功'),
+                content=self.tr("没有找到重复的文件"),
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=2000,
+                parent=GlobalsVal.main_window
+            )
+            return
+
+        w = DuplicateMessageBox(groups, resource_list.file_path, self)
+        if not w.exec():
+            return
+
+        self.trash_files(resource_list, w.get_checked_files())
+
+    def trash_files(self, resource_list, files):
+        if self.trash_worker is not None:
+            InfoBar.warning(
+                title=self.tr('警告'),
+                content=self.tr("上一次删除尚未完成"),
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=2000,
+                parent=GlobalsVal.main_window
+            )
+            return
+
+        resource_list.suspend_watch()
+        self.trash_worker = TrashMover(files, self)
+        self.trash_worker.finished.connect(partial(self.__on_trashed, resource_list))
+        self.trash_worker.start()
+
+    def __on_trashed(self, resource_list, batch, moved, failed):
+        self.trash_worker.wait()
+        self.trash_worker.deleteLater()
+        self.trash_worker = None
+
+        resource_list.remove_entries(moved)
+        content_index.remove(moved)
+        resource_list.resume_watch()
+
+        info = (InfoBar.warning if failed else InfoBar.success)(
+            title=self.tr('警告') if failed else self.tr('成功'),
+            content=self.tr("共删除 {} 个文件，{} 个文件删除失败").format(len(moved), len(failed)),
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=10000,
+            parent=GlobalsVal.main_window
+        )
+        if moved:
+            button = PushButton(self.tr("撤销"))
+            button.clicked.connect(partial(self.undo_trash, resource_list, batch))
+            button.clicked.connect(info.close)
+            info.addWidget(button)
+
+    def undo_trash(self, resource_list, batch):
+        if self.trash_worker is not None or batch != trash.last_batch:
+            InfoBar.warning(
+                title=self.tr('警告'),
+                content=self.tr("只能撤销最近一次删除"),
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.BOTTOM_RIGHT,
+                duration=2000,
+                parent=GlobalsVal.main_window
+            )
+            return
+
+        resource_list.suspend_watch()
+        self.trash_worker = TrashRestorer(batch, self)
+        self.trash_worker.finished.connect(partial(self.__on_restored, resource_list))
+        self.trash_worker.start()
+
+    def __on_restored(self, resource_list, restored, failed):
+        self.trash_worker.wait()
+        self.trash_worker.deleteLater()
+        self.trash_worker = None
+
+        (InfoBar.warning if failed else InfoBar.success)(
+            title=self.tr('警告') if failed else self.tr('成功'),
+            content=self.tr("共恢复 {} 个文件，{} 个文件恢复失败").format(len(restored), len(failed)),
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.BOTTOM_RIGHT,
+            duration=2000,
+            parent=GlobalsVal.main_window
+        )
+        resource_list.resume_watch({os.path.dirname(file) for file in restored})
+
     def get_resource_pivot(self, text):
         if text == "皮肤":
             return self.TeedataSkinsInterface
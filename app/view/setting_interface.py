@@ -12,7 +12,10 @@ from PyQt5.QtWidgets import QWidget, QFileDialog, QPushButton, QHBoxLayout
 from app.config import cfg, base_path, config_path
 from app.globals import GlobalsVal
 from app.utils.config_directory import get_ddnet_directory
+from app.utils.image_cache import image_cache
 from app.utils.network import JsonLoader
+from app.utils.thumbnail_cache import thumbnail_cache
+from app.utils.trash import trash
 
 
 class SettingInterface(ScrollArea):
@@ -108,6 +111,33 @@ class SettingInterface(ScrollArea):
         )
         self.openConfigFolder.clicked.connect(lambda: self.open_folder(config_path))
 
+        self.thumbnailCacheCard = ComboBoxSettingCard(
+            cfg.ThumbnailCacheSize,
+            FluentIcon.SAVE,
+            self.tr('缩略图缓存'),
+            self.tr('材质管理中皮肤缩略图磁盘缓存的容量上限'),
+            texts=["128 MB", "256 MB", "512 MB", "1024 MB", "2048 MB"],
+            parent=self.otherGroup
+        )
+
+        self.imageCacheCard = ComboBoxSettingCard(
+            cfg.ImageCacheSize,
+            FluentIcon.PHOTO,
+            self.tr('缩略图内存'),
+            self.tr('材质管理中已解码缩略图占用内存的上限，超出后释放最久未显示的缩略图'),
+            texts=["64 MB", "128 MB", "256 MB", "512 MB", "1024 MB"],
+            parent=self.otherGroup
+        )
+
+        self.trashSizeCard = ComboBoxSettingCard(
+            cfg.TrashSize,
+            FluentIcon.DELETE,
+            self.tr('回收区'),
+            self.tr('材质管理中删除的文件会暂存在回收区，超出容量或保存超过 7 天后彻底删除'),
+            texts=["128 MB", "256 MB", "512 MB", "1024 MB", "2048 MB"],
+            parent=self.otherGroup
+        )
+
         self.__initWidget()
 
     @staticmethod
@@ -215,6 +245,9 @@ class SettingInterface(ScrollArea):
         self.personalGroup.addSettingCard(self.languageCard)
         self.otherGroup.addSettingCard(self.checkUpdate)
         self.otherGroup.addSettingCard(self.openConfigFolder)
+        self.otherGroup.addSettingCard(self.thumbnailCacheCard)
+        self.otherGroup.addSettingCard(self.imageCacheCard)
+        self.otherGroup.addSettingCard(self.trashSizeCard)
 
         self.expandLayout.addWidget(self.DDNetGroup)
         self.expandLayout.addWidget(self.personalGroup)
@@ -266,6 +299,9 @@ class SettingInterface(ScrollArea):
         self.DDNetFolder.clicked.connect(self.__onDDNetFolderChanged)
         self.themeCard.optionChanged.connect(lambda ci: setTheme(cfg.get(ci)))
         self.themeColorCard.colorChanged.connect(setThemeColor)
+        cfg.ThumbnailCacheSize.valueChanged.connect(lambda size: thumbnail_cache.set_max_size(size * 1024 * 1024))
+        cfg.ImageCacheSize.valueChanged.connect(lambda size: image_cache.set_max_size(size * 1024 * 1024))
+        cfg.TrashSize.valueChanged.connect(lambda size: trash.set_max_size(size * 1024 * 1024))
 
 
     def __FindDDNetFolder(self):
@@ -0,0 +1,294 @@
+"""
+皮肤渲染与材质管理网格的基准测试
+
+生成 100 / 1k / 10k 张不同分辨率的合成皮肤，分别测量冷渲染、热渲染（缩略图缓存命中）
+以及 ResourceList 在离屏 Qt 平台下的完整加载时间，并用 NumPy 将渲染结果与参考实现
+（或 --golden-dir 中保存的金样图片）逐像素比对，结果以 JSON 输出
+
+用法（在仓库根目录下）:
+    python -m benchmarks.bench_skins --counts 100 1000 --output bench_output.json
+    python -m benchmarks.bench_skins --counts 100 --golden-dir benchmarks/golden --update-golden
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+
+def make_skin(rng, scale: int) -> Image.Image:
+    """生成一张结构与 DDNet 皮肤一致的合成皮肤图"""
+    sheet = np.zeros((128, 256, 4), dtype=np.uint8)
+    y, x = np.mgrid[0:128, 0:256]
+
+    def ellipse(cx, cy, rx, ry):
+        return ((x - cx) / rx) ** 2 + ((y - cy) / ry) ** 2 <= 1
+
+    color = rng.integers(0, 256, 3)
+    shade = np.clip(color[None, None, :] * (1 - y[..., None] / 256), 0, 255)
+
+    body = ellipse(48, 48, 40, 40)
+    sheet[body, :3] = shade[body]
+    sheet[body, 3] = 255
+
+    shadow = ellipse(144, 48, 42, 42)
+    sheet[shadow] = (0, 0, 0, 255)
+
+    feet = ellipse(224, 48, 28, 14)
+    sheet[feet, :3] = color[::-1]
+    sheet[feet, 3] = 255
+    feet_shadow = ellipse(224, 80, 30, 15)
+    sheet[feet_shadow] = (0, 0, 0, 255)
+
+    for left in (64, 96, 128, 160, 224):
+        eye = ellipse(left + 16, 112, 8, 12)
+        sheet[eye] = (0, 0, 0, 255)
+        pupil = ellipse(left + 16, 108, 3, 4)
+        sheet[pupil] = (255, 255, 255, 255)
+
+    image = Image.fromarray(sheet, 'RGBA')
+    if scale != 1:
+        image = image.resize((256 * scale, 128 * scale), Image.NEAREST)
+    return image
+
+
+def generate_corpus(folder: str, count: int, scales, seed: int = 0):
+    """在 folder/skins 下生成 count 张皮肤，分辨率在 scales 中轮换"""
+    skins_folder = os.path.join(folder, "skins")
+    os.makedirs(skins_folder, exist_ok=True)
+    os.makedirs(os.path.join(folder, "downloadedskins"), exist_ok=True)
+
+    rng = np.random.default_rng(seed)
+    files = []
+    for i in range(count):
+        file = os.path.join(skins_folder, f"synthetic_{i:05d}.png")
+        make_skin(rng, scales[i % len(scales)]).save(file, compress_level=1)
+        files.append(file)
+    return files
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def result_entry(name, count, seconds, **extra):
+    entry = {"name": name, "count": count, "seconds": round(seconds, 4),
+             "per_item_ms": round(seconds / count * 1000, 4) if count else None}
+    entry.update(extra)
+    return entry
+
+
+def check_reference(files) -> dict:
+    """与旧版 PIL 合成结果比对，只有标准尺寸(256x128)的皮肤有参考结果"""
+    from app.utils.draw_tee import crop_and_generate_image, render_tee
+
+    checked = 0
+    max_diff = 0
+    for file in files:
+        source = Image.open(file)
+        if source.size != (256, 128):
+            continue
+
+        expected = np.asarray(crop_and_generate_image(source.convert('RGBA'), ('default',))['default'])
+        actual = np.asarray(render_tee(file))[0:64]
+        max_diff = max(max_diff, int(np.abs(expected.astype(np.int16) - actual.astype(np.int16)).max()))
+        checked += 1
+
+    return {"checked": checked, "max_diff": max_diff, "passed": max_diff == 0}
+
+
+def check_golden(files, golden_dir: str, size: int, update: bool) -> dict:
+    """与 golden_dir 中的金样图片逐像素比对，update 时重新生成金样"""
+    from app.utils.draw_tee import render_tee
+
+    os.makedirs(golden_dir, exist_ok=True)
+    checked = 0
+    missing = 0
+    failed = []
+    for file in files:
+        golden_file = os.path.join(golden_dir, f"{size}_{os.path.basename(file)}")
+        actual = render_tee(file, size)
+        if actual is None:
+            # 无法读取的文件记为失败
+            failed.append({"file": os.path.basename(file), "error": "render failed"})
+            checked += 1
+            continue
+
+        if update:
+            actual.save(golden_file)
+            checked += 1
+            continue
+
+        if not os.path.isfile(golden_file):
+            missing += 1
+            continue
+
+        expected = np.asarray(Image.open(golden_file).convert('RGBA'), dtype=np.int16)
+        diff = int(np.abs(expected - np.asarray(actual, dtype=np.int16)).max())
+        if diff > 1:
+            failed.append({"file": os.path.basename(file), "max_diff": diff})
+        checked += 1
+
+    return {"size": size, "checked": checked, "missing": missing, "failed": failed,
+            "passed": not failed and missing == 0}
+
+
+def populate_grid(app, folder: str, timeout: float) -> dict:
+    """
+    构建皮肤页 ResourceList 并显示，分别测量首屏缩略图与全部缩略图加载完成的时间
+    视图只会为可见条目请求缩略图，全部加载通过直接向加载器请求所有文件模拟滚动到底
+    """
+    from PyQt5.QtCore import QElapsedTimer
+    from app.globals import GlobalsVal
+    from app.utils.image_cache import image_cache
+    from app.view.resource_interface import ResourceList
+
+    GlobalsVal.ddnet_folder = folder
+
+    def wait_idle(resource_list):
+        # 视图只在绘制时请求缩略图，同步重绘一次确认没有新的请求后才算完成
+        while True:
+            while resource_list.is_loading() or not resource_list.loader.is_idle():
+                app.processEvents()
+                if timer.elapsed() > timeout * 1000:
+                    raise TimeoutError("grid population timed out")
+                time.sleep(0.001)
+
+            resource_list.viewport().repaint()
+            if resource_list.loader.is_idle():
+                return
+
+    timer = QElapsedTimer()
+    timer.start()
+    resource_list = ResourceList('skins')
+    resource_list.resize(1280, 720)
+    resource_list.show()
+    app.processEvents()
+    wait_idle(resource_list)
+    first_screen = timer.elapsed() / 1000
+
+    for file in resource_list.file_list:
+        resource_list.loader.request(file)
+    wait_idle(resource_list)
+    seconds = timer.elapsed() / 1000
+
+    resource_list.loader.stop()
+    # 共用的 image_cache 只按路径区分，不释放时下一次测量会全部命中内存
+    stats = image_cache.stats()
+    image_cache.release(resource_list.resource_model)
+    resource_list.deleteLater()
+    app.processEvents()
+    return {"seconds": seconds, "first_screen_seconds": round(first_screen, 4), "image_cache": stats}
+
+
+def render_cached(file: str, size: int):
+    """与材质页相同的缓存路径：先读缩略图缓存，未命中时渲染并写入缓存"""
+    from app.utils.draw_tee import encode_png, get_cached_tee, render_tee, tee_renderer
+    from app.utils.thumbnail_cache import thumbnail_cache
+
+    image = get_cached_tee(file, size=size)
+    if image is None:
+        image = render_tee(file, size)
+        if image is not None:
+            thumbnail_cache.put(file, tee_renderer(size), encode_png(image))
+    return image
+
+
+def run_corpus(app, work_dir: str, count: int, scales, args) -> list:
+    from app.utils.draw_tee import render_tee, thumbnail_size
+    from app.utils.thumbnail_cache import thumbnail_cache
+
+    folder = os.path.join(work_dir, f"corpus_{count}")
+    generate_seconds, files = timed(generate_corpus, folder, count, scales)
+    results = [result_entry("generate_corpus", count, generate_seconds, scales=scales)]
+
+    size = thumbnail_size()
+
+    thumbnail_cache.clear()
+    seconds, _ = timed(lambda: [render_tee(file, size) for file in files])
+    results.append(result_entry("render_uncached", count, seconds, size=size))
+
+    seconds, _ = timed(lambda: [render_cached(file, size) for file in files])
+    results.append(result_entry("render_cold", count, seconds, size=size))
+
+    seconds, _ = timed(lambda: [render_cached(file, size) for file in files])
+    results.append(result_entry("render_warm", count, seconds, size=size))
+
+    if not args.skip_grid:
+        thumbnail_cache.clear()
+        shutil.rmtree(os.path.join(os.environ["XDG_CONFIG_HOME"], "DDNetToolBox", "app", "cache", "atlas"),
+                      ignore_errors=True)
+        for name in ("grid_cold", "grid_warm"):
+            grid = populate_grid(app, folder, args.timeout)
+            results.append(result_entry(name, count, grid.pop("seconds"), **grid))
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DDNetToolBox skin rendering benchmarks")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4],
+                        help="皮肤分辨率相对 256x128 的倍数")
+    parser.add_argument("--output", help="结果 JSON 文件，默认输出到标准输出")
+    parser.add_argument("--work-dir", help="语料与缓存目录，默认使用临时目录")
+    parser.add_argument("--golden-dir", help="金样图片目录")
+    parser.add_argument("--golden-count", type=int, default=20)
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--skip-grid", action="store_true", help="跳过 ResourceList 加载测试")
+    parser.add_argument("--timeout", type=float, default=1800)
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="ddnettoolbox-bench-")
+    # 缓存、图集与配置全部写入工作目录，不影响真实的配置目录
+    os.environ["XDG_CONFIG_HOME"] = os.path.join(work_dir, "config")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+
+    import PIL
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pillow": PIL.__version__,
+        "results": [],
+        "checks": {}
+    }
+
+    try:
+        for count in args.counts:
+            report["results"] += run_corpus(app, work_dir, count, args.scales, args)
+
+        sample = generate_corpus(os.path.join(work_dir, "golden_corpus"), args.golden_count, args.scales, seed=1)
+        report["checks"]["reference"] = check_reference(sample)
+        if args.golden_dir:
+            report["checks"]["golden"] = [check_golden(sample, args.golden_dir, size, args.update_golden)
+                                          for size in (96, 110, 220)]
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    passed = all(check["passed"] for check in [report["checks"]["reference"]] + report["checks"].get("golden", []))
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
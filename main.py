@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 import time
@@ -84,6 +85,8 @@ def init_window():
 
 
 if __name__ == '__main__':
+    # 打包后皮肤渲染进程池需要
+    multiprocessing.freeze_support()
     # 崩溃回溯
     sys.excepthook = CrashApp
     sys.exit(init_window())